@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Stream notifikasi SSE (/api/notifications/stream/) hanya aktif lewat ASGI,
+mis. `uvicorn backend.asgi:application`. Pub/sub notifikasi berjalan
+in-process, jadi jalankan satu worker ASGI per instance; di bawah WSGI
+(runserver) dashboard otomatis kembali ke polling.
 """
 
 import os
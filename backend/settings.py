@@ -55,6 +55,7 @@ if DEBUG:
     INSTALLED_APPS += ["django_browser_reload"]
 
 MIDDLEWARE = [
+    "dashboard.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -196,8 +197,64 @@ if DEBUG:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Image store untuk dokumentasi AnalysisReport (content-addressed, nama file = SHA-256).
+# Sengaja di luar MEDIA_ROOT supaya gambar hanya bisa diakses lewat view yang memeriksa izin.
+IMAGE_STORE_BACKEND = os.environ.get(
+    'IMAGE_STORE_BACKEND', 'dashboard.services.image_store.FileSystemImageStore'
+)
+IMAGE_STORE_ROOT = os.environ.get('IMAGE_STORE_ROOT', os.path.join(BASE_DIR, 'image_store'))
+# Cache-Control (private) gambar dokumentasi: URL biasa vs URL versioned (?v=<hash>)
+IMAGE_CACHE_MAX_AGE = 60 * 60 * 24
+IMAGE_CACHE_MAX_AGE_VERSIONED = 60 * 60 * 24 * 365
+
 # Telegram Bot Configuration
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', 'YOUR_BOT_TOKEN_HERE')
+# Notifikasi baru diantrekan ke TelegramOutbox hanya bila diaktifkan;
+# pengiriman dilakukan oleh `python manage.py telegram_worker`
+TELEGRAM_DELIVERY_ENABLED = os.environ.get('TELEGRAM_DELIVERY_ENABLED', '0') == '1'
+# Base URL Bot API (bisa diarahkan ke stub server lokal untuk pengujian)
+TELEGRAM_API_BASE = os.environ.get('TELEGRAM_API_BASE', 'https://api.telegram.org')
+# Batas kirim Bot API: ~30 pesan/detik global dan ~1 pesan/detik per chat
+TELEGRAM_RATE_LIMIT_GLOBAL = 30
+TELEGRAM_RATE_LIMIT_PER_CHAT = 1
+TELEGRAM_MAX_ATTEMPTS = 5
+
+# Query budget per request (lihat dashboard.middleware.QueryBudgetMiddleware)
+# Key = nama URL, value = jumlah query maksimal sebelum request dicatat sebagai warning
+QUERY_BUDGETS = {
+    "leader_dashboard": 15,
+    "foreman_dashboard": 15,
+    "admin_dashboard": 10,
+    "admin_dashboard_tab": 10,
+    "notification_center": 15,
+    "compliance_history": 5,
+    "foreman_report_status": 10,
+    "foreman_reports": 10,
+    "notification_list": 10,
+    "user_notifications": 10,
+    "get_notifications": 6,  # poll pertama user baru ikut membuat baris NotificationCounter
+    "mark_notification_read": 5,
+    "mark_notifications_read": 8,
+    "export_reports_csv": 5,
+    "export_users_csv": 5,
+    "serve_analysis_report_image": 5,
+}
+QUERY_BUDGET_DEFAULT = 50
+# Mode strict (untuk test): lempar QueryBudgetExceeded alih-alih hanya log warning
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "0") == "1"
+
+# Retensi notifikasi (lihat command archive_notifications)
+# Notifikasi yang sudah dibaca dipindah ke NotificationArchive setelah N hari;
+# notifikasi yang belum dibaca ikut dipindah bila NOTIFICATION_UNREAD_RETENTION_DAYS diisi
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_UNREAD_RETENTION_DAYS = (
+    int(os.environ["NOTIFICATION_UNREAD_RETENTION_DAYS"])
+    if os.environ.get("NOTIFICATION_UNREAD_RETENTION_DAYS")
+    else None
+)
+
+# Umur maksimum (detik) snapshot kepatuhan sementara di notification center sebelum dihitung ulang
+COMPLIANCE_SNAPSHOT_MAX_AGE = 300
 
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024  # 1MB
@@ -145,9 +145,15 @@ class ActivityReportAdmin(admin.ModelAdmin):
     get_foreman_name.admin_order_field = "foreman__name"
 
     def get_activities_count(self, obj):
-        return obj.activities.count()
+        return obj.activities_count
 
     get_activities_count.short_description = "Activities Count"
+    get_activities_count.admin_order_field = "activities_count"
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Sinkronkan ringkasan setelah inline detail aktivitas disimpan
+        form.instance.refresh_activity_summary()
 
 
 @admin.register(ActivityReportDetail)
@@ -255,40 +261,44 @@ class AnalysisReportAdmin(admin.ModelAdmin):
 
     def has_dokumentasi_sebelum(self, obj):
         """Menampilkan apakah ada dokumentasi sebelum"""
-        return bool(obj.dokumentasi_sebelum_data)
+        return obj.has_image('sebelum')
     has_dokumentasi_sebelum.boolean = True
     has_dokumentasi_sebelum.short_description = "Dokumentasi Sebelum"
 
     def has_dokumentasi_sesudah(self, obj):
         """Menampilkan apakah ada dokumentasi sesudah"""
-        return bool(obj.dokumentasi_sesudah_data)
+        return obj.has_image('sesudah')
     has_dokumentasi_sesudah.boolean = True
     has_dokumentasi_sesudah.short_description = "Dokumentasi Sesudah"
 
+    def _image_preview(self, obj, field_type):
+        """
+        Thumbnail dari endpoint gambar (lazy-load, di-cache browser lewat URL
+        versioned) dengan tautan ke ukuran penuh; isi gambar tidak ikut di HTML.
+        """
+        if not obj.has_image(field_type):
+            return "Tidak ada gambar"
+        return format_html(
+            '<a href="{}" target="_blank"><img src="{}" alt="Dokumentasi {}" loading="lazy" '
+            'decoding="async" style="max-width: 200px; max-height: 200px;" /></a>',
+            obj.image_url(field_type),
+            obj.image_url(field_type, size='thumb'),
+            field_type,
+        )
+
     def preview_dokumentasi_sebelum(self, obj):
         """Menampilkan preview gambar dokumentasi sebelum"""
-        if obj.dokumentasi_sebelum_data:
-            data_url = obj.get_image_data_url('sebelum')
-            return format_html(
-                '<img src="{}" style="max-width: 200px; max-height: 200px;" />',
-                data_url
-            )
-        return "Tidak ada gambar"
+        return self._image_preview(obj, 'sebelum')
     preview_dokumentasi_sebelum.short_description = "Preview Dokumentasi Sebelum"
 
     def preview_dokumentasi_sesudah(self, obj):
         """Menampilkan preview gambar dokumentasi sesudah"""
-        if obj.dokumentasi_sesudah_data:
-            data_url = obj.get_image_data_url('sesudah')
-            return format_html(
-                '<img src="{}" style="max-width: 200px; max-height: 200px;" />',
-                data_url
-            )
-        return "Tidak ada gambar"
+        return self._image_preview(obj, 'sesudah')
     preview_dokumentasi_sesudah.short_description = "Preview Dokumentasi Sesudah"
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('foreman')
+        # Blob gambar tidak di-load; status dokumentasi dari anotasi with_image_flags()
+        return super().get_queryset(request).select_related('foreman').with_image_flags()
 
     def get_foreman_name(self, obj):
         return obj.foreman.name or obj.foreman.get_full_name()
@@ -311,7 +321,7 @@ class AnalysisReportAdmin(admin.ModelAdmin):
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ['title', 'recipient', 'status', 'created_at', 'created_by']
-    list_filter = ['status', 'created_at', 'created_by']
+    list_filter = ['status', 'kind', 'created_at', 'created_by']
     search_fields = ['title', 'message', 'recipient__username', 'recipient__name']
     readonly_fields = ['created_at', 'read_at']
     ordering = ['-created_at']
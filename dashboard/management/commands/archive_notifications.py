@@ -0,0 +1,115 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from dashboard.models import Notification, NotificationArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move notifications past the retention period into NotificationArchive "
+        "(or delete them) in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.NOTIFICATION_RETENTION_DAYS,
+            help="Retention for read notifications in days "
+                 f"(default: NOTIFICATION_RETENTION_DAYS = {settings.NOTIFICATION_RETENTION_DAYS})",
+        )
+        parser.add_argument(
+            "--unread-days",
+            type=int,
+            default=settings.NOTIFICATION_UNREAD_RETENTION_DAYS,
+            help="Retention for unread notifications in days "
+                 "(default: NOTIFICATION_UNREAD_RETENTION_DAYS, unread rows are kept when unset)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of notifications moved per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds to pause between batches (default: 0.5)",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete expired notifications without copying them to the archive",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many notifications would be moved",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or (options["unread_days"] is not None and options["unread_days"] < 1):
+            raise CommandError("Retention must be at least 1 day.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        # Cutoff dihitung sekali supaya semua batch memakai batas yang sama
+        expired = Notification.expired(
+            options["days"], options["unread_days"], now=timezone.now()
+        )
+        action = "deleted" if options["delete"] else "archived"
+
+        if options["dry_run"]:
+            self._report(expired, options, action)
+            return
+
+        batch_size = options["batch_size"]
+        last_id = 0
+        moved = 0
+        while True:
+            # Keyset per id supaya setiap batch sama murahnya
+            ids = list(
+                expired.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            # Kondisi retensi diterapkan ulang saat batch dikunci di archive_batch
+            moved += NotificationArchive.archive_batch(
+                expired.filter(id__in=ids), delete_only=options["delete"]
+            )
+            last_id = ids[-1]
+            self.stdout.write(f"{action.capitalize()} {moved} notification(s)...")
+
+            if len(ids) < batch_size:
+                break
+            # Beri jeda agar lock & I/O tidak menumpuk di database produksi
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Notification retention: {moved} notification(s) {action}."))
+
+    def _report(self, expired, options, action):
+        counts = expired.aggregate(
+            total=Count("id"),
+            read=Count("id", filter=Q(status="read")),
+            unread=Count("id", filter=Q(status="unread")),
+        )
+        batches = -(-counts["total"] // options["batch_size"])
+        self.stdout.write(f"Read notifications older than {options['days']} day(s): {counts['read']}")
+        if options["unread_days"] is not None:
+            self.stdout.write(
+                f"Unread notifications older than {options['unread_days']} day(s): {counts['unread']}"
+            )
+        self.stdout.write(f"Notifications kept: {Notification.objects.count() - counts['total']}")
+        self.stdout.write(f"Rows already archived: {NotificationArchive.objects.count()}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Dry run: {counts['total']} notification(s) would be {action} "
+            f"in {batches} batch(es) of {options['batch_size']}."
+        ))
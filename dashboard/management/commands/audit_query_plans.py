@@ -0,0 +1,181 @@
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dashboard.models import ActivityReport, AnalysisReport, Notification, NotificationCounter, User
+from dashboard.pagination import KeysetPaginator
+from dashboard.services.compliance_service import ReportComplianceService
+from dashboard.services.report_feed_service import ReportFeedService
+from dashboard.services.stats_service import ReportStatsService
+from dashboard.views import ADMIN_DASHBOARD_TABS, _admin_tab_queryset
+
+
+# Pola baris plan yang menandakan full table scan per backend
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # SQLite: "SCAN <tabel>" tanpa "USING (COVERING) INDEX"
+    "sqlite": re.compile(r"\bSCAN (\w+)(?! USING)(?:\s|$)"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the canonical queries behind each dashboard view (built by "
+        "calling the same services the views use) and report sequential scans on "
+        "large tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=1000,
+            help="Only flag sequential scans on tables with at least this many rows (default: 1000)",
+        )
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan for every query",
+        )
+        parser.add_argument(
+            "--fail-on-seq-scan",
+            action="store_true",
+            help="Exit with an error when a sequential scan on a large table is found",
+        )
+
+    def handle(self, *args, **options):
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"EXPLAIN audit is not supported for the '{connection.vendor}' backend.")
+
+        foreman = User.objects.filter(role="foreman").order_by("id").first()
+        leader = User.objects.filter(role="leader").order_by("id").first()
+        if not foreman or not leader:
+            raise CommandError("Need at least one leader and one foreman to build sample queries.")
+
+        table_rows = self._table_sizes()
+        findings = []
+
+        for name, plan in self._plans(self._canonical_queries(foreman, leader)):
+            scanned = sorted(set(pattern.findall(plan)))
+            large = [t for t in scanned if table_rows.get(t, 0) >= options["min_rows"]]
+
+            if large:
+                findings.append((name, large))
+                self.stdout.write(self.style.ERROR(
+                    f"SEQ SCAN  {name}: " + ", ".join(f"{t} ({table_rows[t]} rows)" for t in large)
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK        {name}"))
+
+            if options["verbose_plans"] or large:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if findings:
+            message = f"{len(findings)} quer(ies) with sequential scans on large tables."
+            if options["fail_on_seq_scan"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("No sequential scans on large tables."))
+
+    def _table_sizes(self):
+        """Jumlah baris per tabel dashboard, untuk membedakan tabel besar dan kecil"""
+        return {
+            model._meta.db_table: model._default_manager.count()
+            for model in apps.get_app_config("dashboard").get_models()
+        }
+
+    def _plans(self, queries):
+        """
+        Plan setiap query. Queryset langsung di-EXPLAIN; callable (pemanggilan
+        service) dijalankan dalam transaksi yang di-rollback, lalu setiap
+        SELECT yang dieksekusinya di-EXPLAIN.
+        """
+        for name, query in queries:
+            if isinstance(query, QuerySet):
+                yield name, query.explain()
+                continue
+
+            with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+                query()
+                transaction.set_rollback(True)
+            statements = list(dict.fromkeys(
+                q["sql"] for q in ctx.captured_queries
+                if q["sql"].lstrip("( ").upper().startswith("SELECT")
+            ))
+            for index, sql in enumerate(statements, start=1):
+                label = name if len(statements) == 1 else f"{name} [{index}/{len(statements)}]"
+                yield label, self._explain_sql(sql)
+
+    def _explain_sql(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            return "\n".join(
+                row[0] if len(row) == 1 else " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+    def _canonical_queries(self, foreman, leader):
+        """
+        Query utama di balik setiap view, dengan parameter contoh. Bila view
+        memakai service, query dibangun lewat pemanggilan service yang sama.
+        """
+        today = timezone.localdate()
+        feed = ReportFeedService(leader)
+        stats = {user: ReportStatsService(user, today=today) for user in (foreman, leader)}
+        compliance = ReportComplianceService(today)
+
+        queries = [
+            # foreman_dashboard / foreman_reports (queryset langsung di view)
+            ("foreman: today's activity report",
+             ActivityReport.objects.filter(foreman=foreman, date=today)),
+            ("foreman: activity report history",
+             ActivityReport.objects.filter(foreman=foreman).order_by("-date", "-created_at")[:10]),
+            ("foreman: analysis report history",
+             AnalysisReport.objects.filter(foreman=foreman).order_by("-report_date")[:10]),
+            ("foreman: counters",
+             lambda: stats[foreman].foreman_stats),
+            # leader_dashboard
+            ("leader: counters",
+             lambda: (stats[leader].team_stats, stats[leader].user_counts)),
+            ("leader: pending feed",
+             lambda: feed.paginate(feed.get_feed(statuses=["pending"]), 1)),
+            ("leader: today feed",
+             lambda: feed.paginate(feed.get_feed(on_date=today), 1)),
+            ("leader: validated feed",
+             lambda: feed.paginate(feed.get_feed(statuses=["approved", "rejected"]), 1)),
+            # admin_dashboard
+            ("admin: counters",
+             lambda: (stats[leader].global_stats, stats[leader].user_counts)),
+        ]
+        # admin_dashboard_tab: halaman pertama setiap tab dengan urutan default
+        for tab, config in ADMIN_DASHBOARD_TABS.items():
+            ordering = config["sorts"][0][2]
+            queries.append((
+                f"admin tab: {tab}",
+                lambda tab=tab, ordering=ordering: KeysetPaginator(
+                    _admin_tab_queryset(tab, ""), 20, ordering=ordering
+                ).get_page(None),
+            ))
+        queries += [
+            # notification_center / scheduler
+            ("notification center: missing foremen",
+             compliance.missing_foremen()),
+            ("notification center: shift compliance",
+             lambda: compliance.shift_compliance(1)),
+            ("notification center: counters",
+             lambda: stats[leader].notification_stats),
+            # notifikasi (API, list, dropdown)
+            ("notifications: latest per user",
+             Notification.objects.filter(recipient=foreman).order_by("-created_at", "-id")[:10]),
+            ("notifications: unread counter",
+             lambda: NotificationCounter.unread_for(foreman)),
+        ]
+        return queries
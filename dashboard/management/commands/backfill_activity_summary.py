@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard.models import ActivityReport
+
+
+class Command(BaseCommand):
+    help = "Backfill denormalized activity summary columns on ActivityReport from its details."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of reports processed per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        updated = 0
+
+        while True:
+            # Keyset per id supaya setiap batch sama murahnya
+            batch = list(
+                ActivityReport.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .prefetch_related("activities")[:batch_size]
+            )
+            if not batch:
+                break
+
+            for report in batch:
+                report.apply_activity_summary(
+                    sorted(report.activities.all(), key=lambda d: d.activity_number)
+                )
+
+            with transaction.atomic():
+                ActivityReport.objects.bulk_update(batch, ActivityReport.SUMMARY_FIELDS)
+
+            updated += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Backfilled {updated} report(s)...")
+
+        self.stdout.write(self.style.SUCCESS(f"Activity summary backfilled for {updated} report(s)."))
@@ -0,0 +1,224 @@
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.urls import reverse
+
+from dashboard.models import AnalysisReport, User
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+# Dataset tetap supaya hasil antar run bisa dibandingkan
+DATASET = {
+    "leaders": 3,
+    "foremen_per_leader": 10,
+    "days": 60,
+    "seed": 42,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main dashboard/export endpoints on a fixed seeded dataset "
+        "(wall time, query count, peak memory) and compare with a JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            type=str,
+            default=str(DEFAULT_BASELINE),
+            help=f"Baseline JSON path (default: {DEFAULT_BASELINE})",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write the results of this run as the new baseline",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed relative slowdown/memory growth before flagging (default: 0.25)",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=5.0,
+            help="Ignore wall time differences smaller than this (default: 5ms)",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed runs per endpoint (default: 5)"
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when a regression is flagged",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Reuse the benchmark test database between runs",
+        )
+
+    def handle(self, *args, **options):
+        runner = DiscoverRunner(verbosity=0, interactive=False, keepdb=options["keepdb"])
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            # Jumlah query dibaca dari header X-Query-Count (QueryBudgetMiddleware);
+            # budget dimatikan supaya output benchmark tidak tertimpa warning
+            with override_settings(QUERY_BUDGET_STRICT=False, QUERY_BUDGETS={}, QUERY_BUDGET_DEFAULT=None):
+                self._seed()
+                results = self._run_scenarios(options["repeat"])
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+        self._print_results(results)
+
+        baseline_path = Path(options["baseline"])
+        regressions = []
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            regressions = self._compare(
+                baseline.get("results", {}), results, options["threshold"], options["min_delta_ms"]
+            )
+        else:
+            self.stdout.write(self.style.WARNING(f"No baseline found at {baseline_path}."))
+
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(
+                json.dumps({"dataset": DATASET, "results": results}, indent=2, sort_keys=True)
+            )
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} benchmark regression(s) detected.")
+
+    # ------------------------------------------------------------------
+    # Dataset & scenarios
+    # ------------------------------------------------------------------
+    def _seed(self):
+        if User.objects.filter(username="scale_admin").exists():
+            return
+        self.stdout.write("Seeding benchmark dataset...")
+        call_command(
+            "generate_scale_data",
+            leaders=DATASET["leaders"],
+            foremen_per_leader=DATASET["foremen_per_leader"],
+            days=DATASET["days"],
+            seed=DATASET["seed"],
+            image_ratio=1.0,
+            stdout=io.StringIO(),
+        )
+
+    def _scenarios(self):
+        admin = User.objects.get(username="scale_admin")
+        leader = User.objects.get(username="scale_leader_0")
+        foreman = User.objects.get(username="scale_foreman_0_0")
+        image_report = (
+            AnalysisReport.objects.filter(dokumentasi_sebelum_filename__isnull=False)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .first()
+        )
+
+        scenarios = [
+            ("foreman_dashboard", foreman, reverse("foreman_dashboard")),
+            ("leader_dashboard", leader, reverse("leader_dashboard")),
+            ("admin_dashboard", admin, reverse("admin_dashboard")),
+            ("notification_center", admin, reverse("notification_center")),
+            ("export_reports_csv", admin, reverse("export_reports_csv")),
+            (
+                "export_activity_reports_pdf",
+                admin,
+                f"{reverse('export_activity_reports_pdf')}?foreman={foreman.id}",
+            ),
+        ]
+        if image_report:
+            scenarios.append((
+                "serve_analysis_report_image",
+                admin,
+                reverse("serve_analysis_report_image", args=[image_report, "sebelum"]),
+            ))
+        return scenarios
+
+    def _run_scenarios(self, repeat):
+        results = {}
+        for name, user, url in self._scenarios():
+            client = Client()
+            client.force_login(user)
+
+            # Warm-up sekaligus hitung query dan peak memory
+            tracemalloc.start()
+            response = client.get(url)
+            body = self._consume(response)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            if response.status_code != 200:
+                raise CommandError(f"{name} returned HTTP {response.status_code} for {url}")
+
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                self._consume(client.get(url))
+                timings.append((time.perf_counter() - started) * 1000)
+
+            results[name] = {
+                "wall_ms": round(statistics.median(timings), 2),
+                "queries": int(response.get("X-Query-Count", 0)),
+                "peak_kb": round(peak / 1024, 1),
+                "bytes": len(body),
+            }
+        return results
+
+    def _consume(self, response):
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def _print_results(self, results):
+        self.stdout.write(f"{'endpoint':32} {'wall_ms':>10} {'queries':>8} {'peak_kb':>10} {'bytes':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:32} {result['wall_ms']:>10} {result['queries']:>8} "
+                f"{result['peak_kb']:>10} {result['bytes']:>10}"
+            )
+
+    def _compare(self, baseline, results, threshold, min_delta_ms):
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            # Jumlah query deterministik: setiap kenaikan adalah regresi
+            if result["queries"] > base["queries"]:
+                regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+            if (
+                result["wall_ms"] > base["wall_ms"] * (1 + threshold)
+                and result["wall_ms"] - base["wall_ms"] >= min_delta_ms
+            ):
+                regressions.append(f"{name}: wall_ms {base['wall_ms']} -> {result['wall_ms']}")
+            if base["peak_kb"] and result["peak_kb"] > base["peak_kb"] * (1 + threshold):
+                regressions.append(f"{name}: peak_kb {base['peak_kb']} -> {result['peak_kb']}")
+
+        for message in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {message}"))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
+        return regressions
@@ -0,0 +1,434 @@
+import io
+import random
+import time as time_module
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from dashboard.models import (
+    ActivityReport,
+    ActivityReportDetail,
+    AnalysisReport,
+    LeaderQuota,
+    Notification,
+    NotificationCounter,
+    ReportDailyStats,
+    ShiftSchedule,
+    User,
+    notification_counter_paused,
+    report_stats_paused,
+)
+from dashboard.services.image_store import BASE_RENDITION, render_renditions
+
+
+USERNAME_PREFIX = "scale_"
+
+ACTIVITY_DESCRIPTIONS = [
+    "Pemeriksaan rutin engine dan sistem pendingin",
+    "Penggantian oli mesin dan filter udara",
+    "Perbaikan sistem hidrolik dan pneumatic",
+    "Maintenance berkala komponen undercarriage",
+    "Inspeksi dan perbaikan sistem kelistrikan",
+    "Penggantian spare part yang rusak",
+    "Kalibrasi sistem kontrol dan sensor",
+    "Pembersihan dan pelumasan komponen mesin",
+]
+
+PROBLEM_TITLES = [
+    "Engine overheating pada unit excavator",
+    "Kebocoran oli hidrolik pada sistem boom",
+    "Kerusakan track chain dan sprocket",
+    "Masalah pada sistem kelistrikan alternator",
+    "Penurunan performa engine dan fuel consumption tinggi",
+    "Kerusakan pada sistem pendingin radiator",
+    "Masalah pada transmisi dan final drive",
+    "Kerusakan komponen undercarriage",
+]
+
+
+@contextmanager
+def manual_created_at(*models):
+    """Matikan auto_now_add sementara supaya created_at historis bisa di-bulk insert"""
+    fields = [model._meta.get_field("created_at") for model in models]
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a production-sized dataset with bulk inserts for load testing "
+        "(users, quotas, reports, notifications and shift schedules)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--leaders", type=int, default=20, help="Number of leaders (default: 20)")
+        parser.add_argument(
+            "--foremen-per-leader", type=int, default=10, help="Foremen per leader (default: 10)"
+        )
+        parser.add_argument("--days", type=int, default=90, help="Days of history (default: 90)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Activity reports per transaction/bulk insert (default: 5000)",
+        )
+        parser.add_argument(
+            "--report-rate",
+            type=float,
+            default=0.9,
+            help="Probability a foreman submits a report on a working day (default: 0.9)",
+        )
+        parser.add_argument(
+            "--analysis-per-month",
+            type=int,
+            default=3,
+            help="Analysis reports per foreman per 30 days (default: 3)",
+        )
+        parser.add_argument(
+            "--image-ratio",
+            type=float,
+            default=0.2,
+            help="Fraction of analysis reports with documentation images (default: 0.2)",
+        )
+        parser.add_argument(
+            "--password", type=str, default="password123", help="Password for all generated users"
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help=f"Delete previously generated '{USERNAME_PREFIX}*' users (and their data) first",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.report_rate = options["report_rate"]
+        self.image_ratio = options["image_ratio"]
+        self.analysis_per_month = options["analysis_per_month"]
+        self.days = options["days"]
+        self.today = timezone.localdate()
+        self.start_date = self.today - timedelta(days=self.days - 1)
+        started = time_module.perf_counter()
+
+        existing = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        if existing.exists():
+            if not options["clear"]:
+                raise CommandError(
+                    f"Scale data already exists ('{USERNAME_PREFIX}*' users). Use --clear to regenerate."
+                )
+            self._clear_previous_data(existing)
+
+        # Hash password sekali saja, dipakai semua user
+        self.password_hash = make_password(options["password"])
+        self.images = self._build_sample_images()
+
+        self.counts = {
+            "users": 0,
+            "activity_reports": 0,
+            "activity_details": 0,
+            "analysis_reports": 0,
+            "notifications": 0,
+            "shift_schedules": 0,
+        }
+
+        with manual_created_at(ActivityReport, AnalysisReport, Notification):
+            foremen = self._create_users(options["leaders"], options["foremen_per_leader"])
+            self._create_history(foremen)
+
+        self.stdout.write("Rebuilding report stats rollup...")
+        ReportDailyStats.rebuild()
+        self.stdout.write("Rebuilding notification counters...")
+        NotificationCounter.rebuild()
+
+        elapsed = time_module.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Scale data generated in {elapsed:.1f}s"))
+        for label, value in self.counts.items():
+            self.stdout.write(f"- {label}: {value}")
+        self.stdout.write(f"All users have password: {options['password']}")
+
+    def _clear_previous_data(self, existing_users):
+        self.stdout.write("Clearing previous scale data...")
+        prefix = USERNAME_PREFIX
+        # Tanpa signal rollup/counter, laporan & notifikasi bisa dihapus per batch tanpa memuat semua instance
+        with report_stats_paused(), notification_counter_paused():
+            for queryset in [
+                ActivityReportDetail.objects.filter(activity_report__foreman__username__startswith=prefix),
+                ActivityReport.objects.filter(foreman__username__startswith=prefix),
+                AnalysisReport.objects.filter(foreman__username__startswith=prefix),
+                Notification.objects.filter(recipient__username__startswith=prefix),
+                ShiftSchedule.objects.filter(foreman__username__startswith=prefix),
+                ReportDailyStats.objects.filter(foreman__username__startswith=prefix),
+            ]:
+                self._delete_in_batches(queryset)
+            LeaderQuota.objects.filter(leader_username__startswith=prefix).delete()
+            existing_users.delete()
+
+    def _delete_in_batches(self, queryset):
+        model = queryset.model
+        while True:
+            ids = list(queryset.order_by().values_list("pk", flat=True)[: self.batch_size])
+            if not ids:
+                break
+            model.objects.filter(pk__in=ids).delete()
+
+    # ------------------------------------------------------------------
+    # Users & quotas
+    # ------------------------------------------------------------------
+    def _create_users(self, leader_count, foremen_per_leader):
+        self.stdout.write("Creating users and leader quotas...")
+        departments = [choice[0] for choice in User.DEPARTMENT_CHOICES]
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(
+                    username=f"{USERNAME_PREFIX}admin",
+                    email=f"{USERNAME_PREFIX}admin@company.com",
+                    name="Scale Admin",
+                    role="admin",
+                    password=self.password_hash,
+                )
+            ])
+
+            leaders = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{USERNAME_PREFIX}leader_{i}",
+                        email=f"{USERNAME_PREFIX}leader_{i}@company.com",
+                        name=f"Leader {i}",
+                        role="leader",
+                        department=departments[i % len(departments)],
+                        shift=self.rng.choice([1, 2]),
+                        nrp=f"L{i:05d}",
+                        password=self.password_hash,
+                    )
+                    for i in range(leader_count)
+                ],
+                batch_size=self.batch_size,
+            )
+
+            LeaderQuota.objects.bulk_create(
+                [
+                    LeaderQuota(
+                        leader_name=leader.name,
+                        leader_username=leader.username,
+                        leader_user=leader,
+                        max_foreman=foremen_per_leader,
+                        current_foreman_count=foremen_per_leader,
+                        is_active=True,
+                    )
+                    for leader in leaders
+                ],
+                batch_size=self.batch_size,
+            )
+
+            foremen = User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{USERNAME_PREFIX}foreman_{i}_{j}",
+                        email=f"{USERNAME_PREFIX}foreman_{i}_{j}@company.com",
+                        name=f"Foreman {i}-{j}",
+                        role="foreman",
+                        department=leader.department,
+                        shift=self.rng.choice([1, 2]),
+                        nrp=f"F{i:04d}{j:03d}",
+                        leader=leader,
+                        password=self.password_hash,
+                    )
+                    for i, leader in enumerate(leaders)
+                    for j in range(foremen_per_leader)
+                ],
+                batch_size=self.batch_size,
+            )
+
+        self.counts["users"] = 1 + len(leaders) + len(foremen)
+        return foremen
+
+    # ------------------------------------------------------------------
+    # Reports, notifications & schedules
+    # ------------------------------------------------------------------
+    def _create_history(self, foremen):
+        self.stdout.write(
+            f"Creating {self.days} day(s) of history for {len(foremen)} foremen..."
+        )
+        buffer = self._empty_buffer()
+        cycle = [1, 2, 0]  # Shift1, Shift2, Stop (sama dengan generate_shift_week)
+        analysis_chance = self.analysis_per_month / 30
+
+        for idx, foreman in enumerate(foremen):
+            for day_offset in range(self.days):
+                date = self.start_date + timedelta(days=day_offset)
+                shift = cycle[(idx + day_offset) % len(cycle)]
+
+                buffer["schedules"].append(
+                    ShiftSchedule(
+                        foreman=foreman,
+                        date=date,
+                        shift=shift,
+                        department=foreman.department or "SUPPORT",
+                        is_active=True,
+                        notes="Auto-generated (scale)",
+                    )
+                )
+
+                if shift != 0:
+                    if self.rng.random() < self.report_rate:
+                        self._add_activity_report(buffer, foreman, date)
+                    else:
+                        self._add_reminder(buffer, foreman, date, shift)
+
+                if self.rng.random() < analysis_chance:
+                    self._add_analysis_report(buffer, foreman, date)
+
+            if len(buffer["reports"]) >= self.batch_size:
+                self._flush(buffer)
+                buffer = self._empty_buffer()
+
+        self._flush(buffer)
+
+    def _empty_buffer(self):
+        return {"reports": [], "details": [], "analysis": [], "notifications": [], "schedules": []}
+
+    def _created_at(self, date, hour_range=(8, 20)):
+        moment = datetime.combine(
+            date, time(self.rng.randint(*hour_range), self.rng.randint(0, 59))
+        )
+        return timezone.make_aware(moment)
+
+    def _add_activity_report(self, buffer, foreman, date):
+        components = ActivityReport.COMPONENT_CHOICES
+        codes = ActivityReport.ACTIVITIES_CHOICES
+
+        details = []
+        for number in range(1, self.rng.randint(1, 5) + 1):
+            start = datetime.combine(date, time(self.rng.randint(6, 14), self.rng.choice([0, 15, 30, 45])))
+            stop = start + timedelta(minutes=self.rng.choice([30, 60, 90, 120, 180]))
+            details.append(
+                ActivityReportDetail(
+                    activity_number=number,
+                    unit_code=f"UN{self.rng.randint(100, 999)}",
+                    hm_km=f"{self.rng.randint(1000, 9999)} HM",
+                    start_time=start.time(),
+                    stop_time=stop.time(),
+                    component=self.rng.choice(components)[0],
+                    activities=self.rng.choice(ACTIVITY_DESCRIPTIONS),
+                    activity_code=self.rng.choice(codes)[0],
+                )
+            )
+
+        report = ActivityReport(
+            foreman=foreman,
+            nrp=foreman.nrp,
+            section=foreman.department or "SUPPORT",
+            date=date,
+            status=self._status_for(date),
+            created_at=self._created_at(date),
+        )
+        report.apply_activity_summary(details)
+        buffer["reports"].append(report)
+        buffer["details"].append(details)
+
+    def _add_analysis_report(self, buffer, foreman, date):
+        report = AnalysisReport(
+            foreman=foreman,
+            section_track=self.rng.choice(AnalysisReport.SECTION_CHOICES)[0],
+            email=foreman.email,
+            no_report=f"AR{self.rng.randint(100000, 999999)}",
+            report_date=date,
+            WO_Number=f"WO{self.rng.randint(10000, 99999)}",
+            WO_date=date - timedelta(days=self.rng.randint(1, 5)),
+            unit_code=f"UN{self.rng.randint(100, 999)}",
+            problem=self.rng.choice(AnalysisReport.PROBLEM_CHOICES)[0],
+            Trouble_date=date - timedelta(days=self.rng.randint(1, 10)),
+            Hm=str(self.rng.randint(1000, 9999)),
+            title_problem=self.rng.choice(PROBLEM_TITLES),
+            part_no=f"PN{self.rng.randint(10000, 99999)}",
+            part_name=f"Spare Part {self.rng.randint(1, 100)}",
+            status=self._status_for(date),
+            created_at=self._created_at(date),
+            nama_fungsi_komponen="Komponen berfungsi untuk operasional utama",
+            gejala_masalah="Gejala yang terlihat: performa menurun",
+            akar_penyebab_masalah="Penyebab utama: kurang maintenance",
+            tindakan_dilakukan="Tindakan: penggantian part",
+            tindakan_pencegahan="Pencegahan: maintenance rutin",
+        )
+        if self.rng.random() < self.image_ratio:
+            date_str = date.strftime("%Y%m%d")
+            # Gambar contoh sama isinya, jadi image store hanya menyimpan tiga file
+            for field_type in AnalysisReport.IMAGE_FIELD_TYPES:
+                data, renditions = self.rng.choice(self.images)
+                report.set_image(field_type, data, f"scale_{date_str}_{field_type}.jpg", renditions=renditions)
+        buffer["analysis"].append(report)
+
+    def _add_reminder(self, buffer, foreman, date, shift):
+        deadline = "18:00" if shift == 1 else "05:00"
+        created_at = self._created_at(date, hour_range=(16, 17) if shift == 1 else (3, 4))
+        is_old = (self.today - date).days > 2
+        buffer["notifications"].append(
+            Notification(
+                recipient=foreman,
+                title="🔔 Pengingat Activity Report (H-1 Jam)",
+                message=(
+                    f"Pengingat otomatis: Anda belum mengisi Activity Report untuk tanggal "
+                    f"{date.strftime('%d %B %Y')}. Batas waktu Shift {shift} adalah {deadline}."
+                ),
+                status="read" if is_old else "unread",
+                read_at=created_at + timedelta(hours=1) if is_old else None,
+                created_at=created_at,
+            )
+        )
+
+    def _status_for(self, date):
+        # Laporan lama hampir semua sudah divalidasi, laporan baru masih pending
+        if (self.today - date).days <= 3:
+            return "pending"
+        return "approved" if self.rng.random() < 0.85 else "rejected"
+
+    def _flush(self, buffer):
+        with transaction.atomic():
+            reports = ActivityReport.objects.bulk_create(buffer["reports"], batch_size=self.batch_size)
+            details = []
+            for report, report_details in zip(reports, buffer["details"]):
+                for detail in report_details:
+                    detail.activity_report = report
+                    details.append(detail)
+            ActivityReportDetail.objects.bulk_create(details, batch_size=self.batch_size)
+            AnalysisReport.objects.bulk_create(buffer["analysis"], batch_size=max(1, self.batch_size // 10))
+            Notification.objects.bulk_create(buffer["notifications"], batch_size=self.batch_size)
+            ShiftSchedule.objects.bulk_create(buffer["schedules"], batch_size=self.batch_size)
+
+        self.counts["activity_reports"] += len(reports)
+        self.counts["activity_details"] += len(details)
+        self.counts["analysis_reports"] += len(buffer["analysis"])
+        self.counts["notifications"] += len(buffer["notifications"])
+        self.counts["shift_schedules"] += len(buffer["schedules"])
+        self.stdout.write(
+            f"  ... {self.counts['activity_reports']} activity reports, "
+            f"{self.counts['activity_details']} details"
+        )
+
+    def _build_sample_images(self):
+        """Beberapa JPEG contoh (800x600) beserta rendition-nya, dipakai ulang untuk dokumentasi"""
+        images = []
+        for color in [(180, 60, 40), (40, 120, 180), (90, 160, 70)]:
+            img = Image.new("RGB", (800, 600), color)
+            draw = ImageDraw.Draw(img)
+            for step in range(0, 800, 40):
+                draw.line([(step, 0), (800 - step, 600)], fill=(255, 255, 255), width=3)
+            output = io.BytesIO()
+            img.save(output, format="JPEG", quality=85, optimize=True)
+            output.seek(0)
+            renditions = render_renditions(output)
+            images.append((renditions.pop(BASE_RENDITION), renditions))
+        return images
@@ -0,0 +1,147 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Length
+
+from dashboard.models import AnalysisReport
+from dashboard.services.image_store import BASE_RENDITION, RENDITIONS, get_image_store, render_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Move AnalysisReport documentation images from the database BinaryFields "
+        "into the image store (IMAGE_STORE_BACKEND) in small batches, together with "
+        "their smaller renditions. Rows keep only the SHA-256, size and dimensions. "
+        "Run VACUUM on dashboard_analysisreport afterwards to return the space to "
+        "the operating system."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of reports loaded per batch; bounds memory use (default: 50)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.2,
+            help="Seconds to pause between batches (default: 0.2)",
+        )
+        parser.add_argument(
+            "--keep-blobs",
+            action="store_true",
+            help="Copy images to the store but leave the database blobs in place",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many images would be moved",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        pending = {
+            field_type: Q(**{
+                f"{AnalysisReport.image_field(field_type, 'data')}__isnull": False,
+                f"{AnalysisReport.image_field(field_type, 'sha256')}__isnull": True,
+            })
+            for field_type in AnalysisReport.IMAGE_FIELD_TYPES
+        }
+        pending_reports = AnalysisReport.objects.filter(pending["sebelum"] | pending["sesudah"])
+
+        if options["dry_run"]:
+            self._report(pending)
+            return
+
+        store = get_image_store()
+        columns = ["id"] + [
+            AnalysisReport.image_field(field_type, suffix)
+            for field_type in AnalysisReport.IMAGE_FIELD_TYPES
+            for suffix in ("data", "sha256")
+        ]
+        batch_size = options["batch_size"]
+        last_id = 0
+        moved = moved_bytes = 0
+        while True:
+            # Keyset per id; hanya satu batch blob yang ada di memori sekaligus
+            rows = list(
+                pending_reports.filter(id__gt=last_id)
+                .order_by("id")
+                .values(*columns)[:batch_size]
+            )
+            if not rows:
+                break
+
+            with transaction.atomic():
+                for row in rows:
+                    for field_type in AnalysisReport.IMAGE_FIELD_TYPES:
+                        data = row[AnalysisReport.image_field(field_type, "data")]
+                        if data is None or row[AnalysisReport.image_field(field_type, "sha256")]:
+                            continue
+                        data = bytes(data)
+                        info = store.save(data, self._renditions(data))
+                        moved_bytes += info.size
+                        moved += self._update_row(row["id"], field_type, info, options["keep_blobs"])
+
+            last_id = rows[-1]["id"]
+            self.stdout.write(f"Moved {moved} image(s), {moved_bytes / 1024 / 1024:.1f} MB...")
+
+            if len(rows) < batch_size:
+                break
+            # Beri jeda agar I/O tidak menumpuk di database produksi
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Image store: {moved} image(s) moved, {moved_bytes / 1024 / 1024:.1f} MB."
+        ))
+
+    def _renditions(self, data):
+        """Rendition yang lebih kecil dari gambar lama; None bila blob bukan gambar valid"""
+        try:
+            return render_renditions(
+                io.BytesIO(data), [name for name in RENDITIONS if name != BASE_RENDITION]
+            )
+        except Exception as e:
+            self.stderr.write(f"Cannot render renditions: {e}")
+            return None
+
+    def _update_row(self, report_id, field_type, info, keep_blobs):
+        """
+        Isi metadata image store di baris report. Baris yang sudah punya hash
+        (mis. gambar diunggah ulang selama migrasi) tidak ditimpa.
+        """
+        values = {
+            AnalysisReport.image_field(field_type, "sha256"): info.sha256,
+            AnalysisReport.image_field(field_type, "size"): info.size,
+            AnalysisReport.image_field(field_type, "width"): info.width,
+            AnalysisReport.image_field(field_type, "height"): info.height,
+        }
+        if not keep_blobs:
+            values[AnalysisReport.image_field(field_type, "data")] = None
+        return AnalysisReport.objects.filter(
+            pk=report_id,
+            **{f"{AnalysisReport.image_field(field_type, 'sha256')}__isnull": True},
+        ).update(**values)
+
+    def _report(self, pending):
+        for field_type in AnalysisReport.IMAGE_FIELD_TYPES:
+            stats = AnalysisReport.objects.filter(pending[field_type]).aggregate(
+                images=Count("id"),
+                size=Sum(Length(AnalysisReport.image_field(field_type, "data"))),
+            )
+            self.stdout.write(
+                f"Dokumentasi {field_type}: {stats['images']} image(s), "
+                f"{(stats['size'] or 0) / 1024 / 1024:.1f} MB in the database"
+            )
+        stored = AnalysisReport.objects.filter(
+            Q(dokumentasi_sebelum_sha256__isnull=False) | Q(dokumentasi_sesudah_sha256__isnull=False)
+        ).count()
+        self.stdout.write(f"Reports already using the image store: {stored}")
+        self.stdout.write(self.style.SUCCESS("Dry run: nothing was moved."))
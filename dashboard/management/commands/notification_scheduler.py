@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
@@ -6,23 +8,14 @@ try:
 except Exception:
     BackgroundScheduler = None
 
-from dashboard.models import ActivityReport, User, Notification
+from dashboard.models import ComplianceSnapshot, Notification
+from dashboard.services.compliance_service import ReportComplianceService, shift_deadline
 
 
 def get_foremen_without_report(today, target_shift=None):
-    foremen_qs = User.objects.filter(role='foreman', is_active=True)
-    if target_shift:
-        foremen_qs = foremen_qs.filter(shift=target_shift)
-
-    missing = []
-    for foreman in foremen_qs:
-        has_report_today = ActivityReport.objects.filter(
-            foreman=foreman,
-            date=today
-        ).exists()
-        if not has_report_today:
-            missing.append(foreman)
-    return missing
+    return list(
+        ReportComplianceService(today).missing_foremen(shift=target_shift).values_list("id", flat=True)
+    )
 
 
 def send_pre_deadline_reminders(target_shift):
@@ -46,13 +39,37 @@ def send_pre_deadline_reminders(target_shift):
         f"Mohon segera isi sebelum lewat waktu."
     )
 
-    Notification.create_broadcast_notification(
+    # Idempotent per (foreman, shift, tanggal): restart scheduler tidak mengirim ulang
+    return Notification.bulk_broadcast(
         title=title,
         message=message,
         recipients=recipients,
         created_by=None,  # Sistem
+        kind=f"pre_deadline_shift{target_shift}",
+        key_date=today,
+    )
+
+
+def finalize_compliance_snapshots(now=None):
+    """
+    Ambil snapshot kepatuhan final untuk setiap shift yang deadline-nya sudah
+    lewat (hari ini dan dua hari sebelumnya, supaya downtime scheduler tetap tertutup).
+    Return jumlah snapshot yang difinalkan.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    dates = [today - timedelta(days=offset) for offset in range(3)]
+    finalized = set(
+        ComplianceSnapshot.objects.filter(date__in=dates, is_final=True).values_list("date", "shift")
     )
-    return len(recipients)
+    count = 0
+    for date in dates:
+        service = ReportComplianceService(date)
+        for shift, _ in ComplianceSnapshot.SHIFT_CHOICES:
+            if (date, shift) not in finalized and shift_deadline(date, shift) <= now:
+                service.snapshot(shift, final=True)
+                count += 1
+    return count
 
 
 class Command(BaseCommand):
@@ -69,12 +86,14 @@ class Command(BaseCommand):
 
         scheduler = BackgroundScheduler(timezone=str(timezone.get_current_timezone()))
 
-        # Send immediately at start (useful after restarts)
+        # Send immediately at start (useful after restarts; foremen already reminded today are skipped)
         sent_shift1 = send_pre_deadline_reminders(target_shift=1)
         sent_shift2 = send_pre_deadline_reminders(target_shift=2)
         self.stdout.write(self.style.SUCCESS(
             f"Startup reminders sent: Shift1={sent_shift1}, Shift2={sent_shift2}"
         ))
+        finalized = finalize_compliance_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Compliance snapshots finalized at startup: {finalized}"))
 
         # Schedule daily reminders 1 hour before deadlines
         # Shift 1 deadline at 18:00 -> reminder at 17:00 local time
@@ -88,6 +107,12 @@ class Command(BaseCommand):
             'cron', hour=4, minute=0, id='pre_deadline_shift2', replace_existing=True
         )
 
+        # Snapshot kepatuhan final sesaat setelah deadline (5 menit toleransi untuk submit terakhir)
+        scheduler.add_job(
+            self._finalize_and_log,
+            'cron', hour='18,5', minute=5, id='compliance_snapshots', replace_existing=True
+        )
+
         self.stdout.write(self.style.SUCCESS("Notification scheduler started. Running in background..."))
 
         try:
@@ -101,4 +126,8 @@ class Command(BaseCommand):
 
     def _run_and_log(self, shift):
         count = send_pre_deadline_reminders(target_shift=shift)
-        self.stdout.write(self.style.SUCCESS(f"Pre-deadline reminders sent for Shift {shift}: {count}"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"Pre-deadline reminders sent for Shift {shift}: {count}"))
+
+    def _finalize_and_log(self):
+        count = finalize_compliance_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Compliance snapshots finalized: {count}"))
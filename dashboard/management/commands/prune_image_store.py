@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from dashboard.models import AnalysisReport
+from dashboard.services.image_store import get_image_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete images (and their renditions) from the image store that are no "
+        "longer referenced by any AnalysisReport, e.g. after a report was deleted "
+        "or its documentation image was replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Only delete images last written at least this many hours ago, so "
+                 "uploads whose report is not saved yet are kept (default: 24)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of candidate images re-checked against the database per query (default: 500)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many images would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        if options["min_age"] < 0:
+            raise CommandError("--min-age cannot be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        store = get_image_store()
+        referenced = self._referenced()
+        older_than = time.time() - options["min_age"] * 3600
+        candidates = [
+            sha256 for sha256 in store.hashes(older_than=older_than) if sha256 not in referenced
+        ]
+        self.stdout.write(
+            f"{len(referenced)} referenced image(s), {len(candidates)} unreferenced image(s) in the store."
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("Dry run: nothing was deleted."))
+            return
+
+        deleted = 0
+        batch_size = options["batch_size"]
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            # Cek ulang tepat sebelum menghapus: upload baru bisa memakai hash yang sama
+            still_used = self._referenced(batch)
+            for sha256 in batch:
+                if sha256 not in still_used:
+                    store.delete(sha256)
+                    deleted += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Image store: {deleted} unreferenced image(s) deleted."))
+
+    def _referenced(self, hashes=None):
+        """Hash gambar yang masih dipakai AnalysisReport (opsional dibatasi ke `hashes`)"""
+        referenced = set()
+        for field_type in AnalysisReport.IMAGE_FIELD_TYPES:
+            field = AnalysisReport.image_field(field_type, "sha256")
+            condition = Q(**{f"{field}__isnull": False})
+            if hashes is not None:
+                condition &= Q(**{f"{field}__in": hashes})
+            referenced.update(
+                AnalysisReport.objects.filter(condition).values_list(field, flat=True).iterator()
+            )
+        return referenced
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import NotificationCounter
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user unread NotificationCounter from Notification."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of counter rows per bulk insert (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        rows = NotificationCounter.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt notification counters: {rows} user(s)."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.models import ReportDailyStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ReportDailyStats rollup from ActivityReport and AnalysisReport."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rollup rows per bulk insert (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        rows = ReportDailyStats.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt report stats: {rows} rollup row(s)."))
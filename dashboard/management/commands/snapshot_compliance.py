@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard.models import ComplianceSnapshot
+from dashboard.services.compliance_service import ReportComplianceService, shift_deadline
+
+
+class Command(BaseCommand):
+    help = (
+        "Capture per-shift report compliance into ComplianceSnapshot. Shifts whose "
+        "deadline has passed are stored as final. Use --days to backfill history "
+        "(foremen without a ShiftSchedule fall back to their current User.shift)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Last date to capture, YYYY-MM-DD (default: today)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="Number of days to capture, counting back from --date (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            try:
+                end_date = datetime.strptime(options["date"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--date must use the YYYY-MM-DD format.")
+        else:
+            end_date = timezone.localdate()
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+
+        now = timezone.now()
+        captured = 0
+        for offset in range(options["days"] - 1, -1, -1):
+            date = end_date - timedelta(days=offset)
+            service = ReportComplianceService(date)
+            for shift, _ in ComplianceSnapshot.SHIFT_CHOICES:
+                snapshot = service.snapshot(shift, final=shift_deadline(date, shift) <= now)
+                captured += 1
+                self.stdout.write(
+                    f"{date} {snapshot.get_shift_display()}: {snapshot.submitted}/{snapshot.expected}"
+                    f"{'' if snapshot.is_final else ' (provisional)'}"
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Captured {captured} compliance snapshot(s)."))
@@ -0,0 +1,85 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from dashboard.services.telegram_delivery import (
+    RateLimiter,
+    TelegramClient,
+    TelegramDeliveryWorker,
+)
+
+
+class Command(BaseCommand):
+    help = "Deliver queued TelegramOutbox messages to the Telegram Bot API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of sender threads (default: 4)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of messages claimed per round (default: 100)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty (default: 5)",
+        )
+        parser.add_argument(
+            "--api-base",
+            default=settings.TELEGRAM_API_BASE,
+            help="Bot API base URL, e.g. a local stub server "
+                 f"(default: TELEGRAM_API_BASE = {settings.TELEGRAM_API_BASE})",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the messages that are currently due, then exit",
+        )
+
+    def handle(self, *args, **options):
+        token = settings.TELEGRAM_BOT_TOKEN
+        if not token or token == "YOUR_BOT_TOKEN_HERE":
+            raise CommandError("TELEGRAM_BOT_TOKEN is not configured.")
+
+        worker = TelegramDeliveryWorker(
+            TelegramClient(token, options["api_base"]),
+            RateLimiter(settings.TELEGRAM_RATE_LIMIT_GLOBAL, settings.TELEGRAM_RATE_LIMIT_PER_CHAT),
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            max_attempts=settings.TELEGRAM_MAX_ATTEMPTS,
+        )
+        totals = {"sent": 0, "retry": 0, "failed": 0}
+        self.stdout.write(self.style.SUCCESS("Telegram worker started."))
+        try:
+            while True:
+                # Proses berjalan lama: buang koneksi database yang sudah kedaluwarsa
+                close_old_connections()
+                results = worker.run_once()
+                for key, value in results.items():
+                    totals[key] += value
+                if any(results.values()):
+                    self.stdout.write(
+                        f"Sent {results['sent']}, retry {results['retry']}, failed {results['failed']}"
+                    )
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Telegram worker stopped."))
+        finally:
+            worker.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Telegram delivery: {totals['sent']} sent, {totals['retry']} to retry, "
+            f"{totals['failed']} failed."
+        ))
@@ -0,0 +1,89 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Dilempar pada mode strict ketika sebuah view melewati budget query-nya"""
+
+
+class QueryBudgetMiddleware:
+    """
+    Hitung jumlah query SQL dan total waktu DB per request.
+
+    - Hasilnya dikirim sebagai header `X-Query-Count` dan `Server-Timing`.
+    - Request yang melebihi budget (settings.QUERY_BUDGETS per nama URL,
+      fallback ke settings.QUERY_BUDGET_DEFAULT) dicatat sebagai warning.
+    - settings.QUERY_BUDGET_STRICT = True (untuk test) melempar QueryBudgetExceeded.
+    - Mendukung WSGI dan ASGI (sync & async).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Di bawah ASGI tetap async, supaya view async (stream SSE) tidak
+        # dipaksa berjalan di thread sync
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self._count_queries() as stats:
+            response = self.get_response(request)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        with self._count_queries() as stats:
+            response = await self.get_response(request)
+        return self._finish(request, response, stats)
+
+    @contextmanager
+    def _count_queries(self):
+        stats = {"count": 0, "duration": 0.0}
+
+        def counter(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats["count"] += 1
+                stats["duration"] += time.perf_counter() - start
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            yield stats
+
+    def _finish(self, request, response, stats):
+        db_ms = stats["duration"] * 1000
+        response["X-Query-Count"] = str(stats["count"])
+        response["Server-Timing"] = f'db;dur={db_ms:.1f};desc="{stats["count"]} queries"'
+
+        self._check_budget(request, stats["count"], db_ms)
+        return response
+
+    def _check_budget(self, request, query_count, db_ms):
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match else None
+
+        budgets = getattr(settings, "QUERY_BUDGETS", {})
+        budget = budgets.get(url_name, getattr(settings, "QUERY_BUDGET_DEFAULT", None))
+        if budget is None or query_count <= budget:
+            return
+
+        message = (
+            f"Query budget exceeded for {url_name or request.path}: "
+            f"{query_count} queries (budget {budget}), db {db_ms:.1f} ms"
+        )
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
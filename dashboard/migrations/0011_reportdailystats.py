@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 00:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Tanggal laporan')),
+                ('report_type', models.CharField(choices=[('activity', 'Activity Report'), ('analysis', 'Analysis Report')], max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('foreman', models.ForeignKey(limit_choices_to={'role': 'foreman'}, on_delete=django.db.models.deletion.CASCADE, related_name='report_daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Report Daily Stats',
+                'verbose_name_plural': 'Report Daily Stats',
+                'indexes': [models.Index(fields=['report_type', 'status', 'date'], name='dashboard_rds_type_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('foreman', 'date', 'report_type', 'status'), name='dashboard_rds_unique_key')],
+            },
+        ),
+    ]
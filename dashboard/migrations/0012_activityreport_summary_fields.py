@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-17 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0011_reportdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activityreport',
+            name='activities_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='activityreport',
+            name='first_activity_code',
+            field=models.CharField(blank=True, choices=[('SC', 'SC'), ('USC', 'USC'), ('ACD', 'ACD')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='activityreport',
+            name='first_component',
+            field=models.CharField(blank=True, choices=[('Component_1', 'Engine'), ('Component_2', 'Clutch - Couper'), ('Component_3', 'PTO'), ('Component_4', 'Transmisi'), ('Component_5', 'Final Drive'), ('Component_6', 'Travel - Axle'), ('Component_7', 'Steering'), ('Component_8', 'Under Carriage'), ('Component_9', 'Wheel'), ('Component_10', 'Frame & Guard'), ('Component_11', 'Electric'), ('Component_12', 'Brake'), ('Component_13', 'Suspension'), ('Component_14', 'Hydraulic'), ('Component_15', 'Pneumatic'), ('Component_16', 'Swing System'), ('Component_17', 'Attachment'), ('Component_18', 'GET'), ('Component_19', 'Vessel Assy'), ('Component_20', 'Generating Set'), ('Component_21', 'Dewatering Pump'), ('Component_22', 'Optional Accessories'), ('Component_23', 'Tank & Piping'), ('Component_24', 'AC'), ('Component_25', 'Stone Crusher'), ('Component_26', 'Daily Maintenance'), ('Component_27', '12 Mounth Service'), ('Component_28', '6 Mounth Service'), ('Component_29', '90 Days Service'), ('Component_30', '30 Days Service'), ('Component_31', '10 Dayts Service'), ('Component_32', 'PPA'), ('Component_33', 'PPU'), ('Component_34', 'PPM'), ('Component_35', 'PAP'), ('Component_36', '4000 Hour Service'), ('Component_37', '2000 Hour Service'), ('Component_38', '1000 Hour Service'), ('Component_39', '500 Hour Service'), ('Component_40', '250 Hour Service'), ('Component_41', '100 Hour Service (Inisial)'), ('Component_42', '50 Hour Service (inisial)'), ('Component_43', '100 Hour Dialy Check'), ('Component_44', 'Component Overhaul'), ('Component_45', 'Component Midlive'), ('Component_46', '20.000 KM Service'), ('Component_47', '15.000 KM Service'), ('Component_48', '10.000 KM Service'), ('Component_49', '5.000 KM Service'), ('Component_50', '2.500 KM Service')], default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='activityreport',
+            name='first_unit_code',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='activityreport',
+            name='total_duration_minutes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_activityreport_summary_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activityreport',
+            index=models.Index(fields=['foreman', '-date'], name='dashboard_ar_foreman_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityreport',
+            index=models.Index(fields=['status', '-date'], name='dashboard_ar_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityreport',
+            index=models.Index(fields=['-date', '-created_at'], name='dashboard_ar_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisreport',
+            index=models.Index(fields=['foreman', '-report_date'], name='dashboard_an_foreman_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisreport',
+            index=models.Index(fields=['status', '-report_date'], name='dashboard_an_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisreport',
+            index=models.Index(fields=['-created_at'], name='dashboard_an_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='dashboard_n_recipient_created'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1 on 2026-10-17 01:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    Notification = apps.get_model("dashboard", "Notification")
+    NotificationCounter = apps.get_model("dashboard", "NotificationCounter")
+    unread = (
+        Notification.objects.filter(status="unread")
+        .order_by()
+        .values("recipient_id")
+        .annotate(total=models.Count("id"))
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=row["recipient_id"], unread=row["total"]) for row in unread],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_report_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Notification Counter',
+                'verbose_name_plural': 'Notification Counters',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
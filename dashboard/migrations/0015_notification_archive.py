@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-17 01:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0014_notification_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigIntegerField(help_text='ID notifikasi asli', primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('status', models.CharField(choices=[('unread', 'Belum Dibaca'), ('read', 'Sudah Dibaca')], max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('recipient', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Arsip Notifikasi',
+                'verbose_name_plural': 'Arsip Notifikasi',
+                'indexes': [models.Index(fields=['recipient', '-created_at'], name='dashboard_na_recipient_idx')],
+            },
+        ),
+    ]
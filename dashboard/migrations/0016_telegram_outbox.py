@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-17 01:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0015_notification_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TelegramOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.CharField(max_length=50)),
+                ('text', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Menunggu'), ('sending', 'Sedang Dikirim'), ('sent', 'Terkirim'), ('failed', 'Gagal')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('notification', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='telegram_messages', to='dashboard.notification')),
+            ],
+            options={
+                'verbose_name': 'Telegram Outbox',
+                'verbose_name_plural': 'Telegram Outbox',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='dashboard_tg_due_idx')],
+            },
+        ),
+    ]
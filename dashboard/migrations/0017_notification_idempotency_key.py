@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-17 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0016_telegram_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='key_date',
+            field=models.DateField(blank=True, help_text='Tanggal pengingat; bila diisi notifikasi tidak akan dikirim dua kali', null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(blank=True, choices=[('', 'Umum'), ('report_reminder', 'Pengingat Activity Report'), ('pre_deadline_shift1', 'Pengingat H-1 Jam Shift 1'), ('pre_deadline_shift2', 'Pengingat H-1 Jam Shift 2')], default='', help_text='Jenis pengingat (kosong untuk notifikasi umum)', max_length=30),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('key_date__isnull', False)), fields=('kind', 'key_date', 'recipient'), name='dashboard_n_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1 on 2026-10-17 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0017_notification_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplianceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Tanggal laporan')),
+                ('shift', models.IntegerField(choices=[(1, 'Shift 1'), (2, 'Shift 2')])),
+                ('expected', models.PositiveIntegerField(default=0, help_text='Foreman yang dijadwalkan')),
+                ('submitted', models.PositiveIntegerField(default=0, help_text='Foreman yang sudah mengisi')),
+                ('missing_foremen', models.JSONField(blank=True, default=list, help_text='ID foreman yang belum mengisi')),
+                ('is_final', models.BooleanField(default=False, help_text='Diambil setelah deadline shift')),
+                ('taken_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Compliance Snapshot',
+                'verbose_name_plural': 'Compliance Snapshots',
+                'ordering': ['-date', 'shift'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'shift'), name='dashboard_cs_date_shift')],
+            },
+        ),
+    ]
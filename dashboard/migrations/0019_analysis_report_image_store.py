@@ -0,0 +1,53 @@
+# Generated by Django 5.1 on 2026-10-17 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0018_compliance_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sebelum_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sebelum_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 gambar sebelum di image store (lihat IMAGE_STORE_BACKEND)', max_length=64, null=True, verbose_name='Hash Gambar Sebelum'),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sebelum_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Ukuran file gambar sebelum dalam byte', null=True, verbose_name='Ukuran Gambar Sebelum'),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sebelum_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sesudah_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sesudah_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 gambar sesudah di image store (lihat IMAGE_STORE_BACKEND)', max_length=64, null=True, verbose_name='Hash Gambar Sesudah'),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sesudah_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Ukuran file gambar sesudah dalam byte', null=True, verbose_name='Ukuran Gambar Sesudah'),
+        ),
+        migrations.AddField(
+            model_name='analysisreport',
+            name='dokumentasi_sesudah_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-17 01:39
+
+import dashboard.services.notification_sync
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0019_analysis_report_image_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='version',
+            field=models.BigIntegerField(default=dashboard.services.notification_sync.version_seed),
+        ),
+    ]
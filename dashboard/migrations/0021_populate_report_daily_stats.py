@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def populate_report_daily_stats(apps, schema_editor):
+    """Isi rollup dari tabel laporan (0011 hanya membuat tabelnya)"""
+    ReportDailyStats = apps.get_model("dashboard", "ReportDailyStats")
+    rows = []
+    for report_type, model_name, date_field in (
+        ("activity", "ActivityReport", "date"),
+        ("analysis", "AnalysisReport", "report_date"),
+    ):
+        grouped = (
+            apps.get_model("dashboard", model_name).objects.order_by()
+            .values("foreman_id", date_field, "status")
+            .annotate(total=models.Count("id"))
+        )
+        for row in grouped.iterator():
+            rows.append(ReportDailyStats(
+                foreman_id=row["foreman_id"],
+                date=row[date_field],
+                report_type=report_type,
+                status=row["status"],
+                count=row["total"],
+            ))
+    ReportDailyStats.objects.all().delete()
+    ReportDailyStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0020_notification_counter_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_report_daily_stats, migrations.RunPython.noop),
+    ]
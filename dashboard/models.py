@@ -1,13 +1,24 @@
-from django.db import models
-from django.db.models.signals import pre_delete
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
 from django.dispatch import receiver
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils import timezone
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from html import escape
+import logging
 import os
-from PIL import Image
 import io
-import base64
+
+from .services.image_store import BASE_RENDITION, get_image_store, render_renditions
+from .services.notification_sync import notification_changed, version_seed
+
+logger = logging.getLogger(__name__)
 
 
 def analysis_report_upload_path(instance, filename):
@@ -32,32 +43,29 @@ def analysis_report_upload_path(instance, filename):
     return f"analysis_reports/{new_filename}"
 
 
-def process_image_for_database(image_file, max_size=(800, 600), quality=85):
+def process_image_renditions(image_file, quality=85):
     """
-    Memproses gambar menggunakan Pillow sebelum disimpan ke database
+    Memproses gambar upload menggunakan Pillow menjadi semua rendition
+    (thumb/medium/print, lihat image_store.RENDITIONS). Return dict {nama: bytes}.
     """
     try:
-        # Buka gambar dengan Pillow
-        img = Image.open(image_file)
-        
-        # Convert ke RGB jika perlu (untuk PNG dengan transparency)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            img = img.convert('RGB')
-        
-        # Resize gambar jika terlalu besar
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-        
-        # Simpan ke BytesIO dengan kompresi
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=quality, optimize=True)
-        output.seek(0)
-        
-        return output.getvalue()
-    except Exception as e:
-        print(f"Error processing image: {e}")
+        return render_renditions(image_file, quality=quality)
+    except Exception:
+        logger.exception("Error processing image")
         return None
 
 
+def activity_duration_minutes(start_time, stop_time):
+    """Durasi aktivitas dalam menit, termasuk aktivitas yang melewati tengah malam"""
+    if not start_time or not stop_time:
+        return 0
+    start = start_time.hour * 60 + start_time.minute
+    stop = stop_time.hour * 60 + stop_time.minute
+    if stop < start:
+        stop += 24 * 60
+    return stop - start
+
+
 def generate_image_filename(foreman, report_date, field_type):
     """
     Generate nama file untuk gambar
@@ -351,13 +359,69 @@ class ActivityReport(models.Model):
     feedback = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
 
+    # Ringkasan detail aktivitas (denormalisasi) agar listing/export tidak query per baris.
+    # Diisi oleh refresh_activity_summary() / command backfill_activity_summary
+    first_unit_code = models.CharField(max_length=100, blank=True, default="")
+    first_component = models.CharField(
+        max_length=100, choices=COMPONENT_CHOICES, blank=True, default=""
+    )
+    first_activity_code = models.CharField(
+        max_length=10, choices=ACTIVITIES_CHOICES, blank=True, default=""
+    )
+    activities_count = models.PositiveIntegerField(default=0)
+    total_duration_minutes = models.PositiveIntegerField(default=0)
+
+    SUMMARY_FIELDS = [
+        "first_unit_code",
+        "first_component",
+        "first_activity_code",
+        "activities_count",
+        "total_duration_minutes",
+    ]
+
     def __str__(self):
         return f"Activity Report - {self.foreman.get_full_name()} - {self.date}"
 
+    @staticmethod
+    def build_activity_summary(details):
+        """
+        Hitung nilai field ringkasan dari detail aktivitas
+        (details harus sudah urut berdasarkan activity_number)
+        """
+        details = list(details)
+        first = details[0] if details else None
+        return {
+            "first_unit_code": first.unit_code if first else "",
+            "first_component": first.component if first else "",
+            "first_activity_code": first.activity_code if first else "",
+            "activities_count": len(details),
+            "total_duration_minutes": sum(
+                activity_duration_minutes(d.start_time, d.stop_time) for d in details
+            ),
+        }
+
+    def apply_activity_summary(self, details):
+        for field, value in self.build_activity_summary(details).items():
+            setattr(self, field, value)
+
+    def refresh_activity_summary(self, commit=True):
+        """Sinkronkan field ringkasan dengan detail aktivitas yang tersimpan"""
+        self.apply_activity_summary(self.activities.order_by("activity_number"))
+        if commit:
+            self.save(update_fields=self.SUMMARY_FIELDS)
+
     class Meta:
         verbose_name = "Activity Report"
         verbose_name_plural = "Activity Reports"
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Riwayat laporan foreman & cek "sudah lapor hari ini"
+            models.Index(fields=["foreman", "-date"], name="dashboard_ar_foreman_date_idx"),
+            # Tab pending/validated di dashboard admin & leader
+            models.Index(fields=["status", "-date"], name="dashboard_ar_status_date_idx"),
+            # Daftar semua laporan sesuai ordering default
+            models.Index(fields=["-date", "-created_at"], name="dashboard_ar_date_created_idx"),
+        ]
 
 
 class ActivityReportDetail(models.Model):
@@ -405,6 +469,50 @@ class ActivityReportDetail(models.Model):
         unique_together = ['activity_report', 'activity_number']
 
 
+class AnalysisReportQuerySet(models.QuerySet):
+    """
+    QuerySet AnalysisReport. Manager default men-defer blob gambar lama
+    (dokumentasi_*_data) sehingga listing, export dan admin tidak ikut
+    menarik isi gambar; pakai `.with_images()` bila blob memang dibutuhkan.
+    """
+
+    def without_images(self):
+        return self.defer(*self.model.IMAGE_BLOB_FIELDS)
+
+    def with_images(self, *field_types):
+        """
+        Ikut load blob gambar (semua, atau hanya `field_types` tertentu).
+        Menghapus defer() sebelumnya, jadi panggil sebelum defer()/only() lain.
+        """
+        field_types = field_types or self.model.IMAGE_FIELD_TYPES
+        skipped = [
+            self.model.image_field(field_type, 'data')
+            for field_type in self.model.IMAGE_FIELD_TYPES
+            if field_type not in field_types
+        ]
+        qs = self.defer(None)
+        return qs.defer(*skipped) if skipped else qs
+
+    def with_image_flags(self):
+        """
+        Anotasi has_dokumentasi_<type> (ada gambar di image store atau blob)
+        tanpa membaca blob; dipakai AnalysisReport.has_image().
+        """
+        return self.annotate(**{
+            f"has_dokumentasi_{field_type}": models.ExpressionWrapper(
+                models.Q(**{f"{self.model.image_field(field_type, 'sha256')}__isnull": False})
+                | models.Q(**{f"{self.model.image_field(field_type, 'data')}__isnull": False}),
+                output_field=models.BooleanField(),
+            )
+            for field_type in self.model.IMAGE_FIELD_TYPES
+        })
+
+
+class AnalysisReportManager(models.Manager.from_queryset(AnalysisReportQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().without_images()
+
+
 class AnalysisReport(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -546,7 +654,13 @@ class AnalysisReport(models.Model):
         blank=True, null=True
     )
     
-    # Dokumentasi gambar - disimpan di database sebagai binary data
+    # Dokumentasi gambar. Isi gambar disimpan di image store (content-addressed,
+    # lihat services/image_store.py); baris hanya menyimpan hash, ukuran dan dimensi.
+    # Field *_data adalah penyimpanan lama di database, dikosongkan oleh
+    # command migrate_images_to_store.
+    IMAGE_FIELD_TYPES = ('sebelum', 'sesudah')
+    IMAGE_BLOB_FIELDS = ('dokumentasi_sebelum_data', 'dokumentasi_sesudah_data')
+    
     dokumentasi_sebelum_data = models.BinaryField(
         verbose_name="Data Gambar Sebelum",
         help_text="Data binary gambar sebelum perbaikan",
@@ -567,6 +681,22 @@ class AnalysisReport(models.Model):
         blank=True, null=True
     )
     
+    dokumentasi_sebelum_sha256 = models.CharField(
+        max_length=64,
+        verbose_name="Hash Gambar Sebelum",
+        help_text="SHA-256 gambar sebelum di image store (lihat IMAGE_STORE_BACKEND)",
+        blank=True, null=True
+    )
+    
+    dokumentasi_sebelum_size = models.PositiveIntegerField(
+        verbose_name="Ukuran Gambar Sebelum",
+        help_text="Ukuran file gambar sebelum dalam byte",
+        blank=True, null=True
+    )
+    
+    dokumentasi_sebelum_width = models.PositiveIntegerField(blank=True, null=True)
+    dokumentasi_sebelum_height = models.PositiveIntegerField(blank=True, null=True)
+    
     dokumentasi_sesudah_data = models.BinaryField(
         verbose_name="Data Gambar Sesudah",
         help_text="Data binary gambar sesudah perbaikan",
@@ -587,54 +717,113 @@ class AnalysisReport(models.Model):
         blank=True, null=True
     )
     
+    dokumentasi_sesudah_sha256 = models.CharField(
+        max_length=64,
+        verbose_name="Hash Gambar Sesudah",
+        help_text="SHA-256 gambar sesudah di image store (lihat IMAGE_STORE_BACKEND)",
+        blank=True, null=True
+    )
+    
+    dokumentasi_sesudah_size = models.PositiveIntegerField(
+        verbose_name="Ukuran Gambar Sesudah",
+        help_text="Ukuran file gambar sesudah dalam byte",
+        blank=True, null=True
+    )
+    
+    dokumentasi_sesudah_width = models.PositiveIntegerField(blank=True, null=True)
+    dokumentasi_sesudah_height = models.PositiveIntegerField(blank=True, null=True)
+    
+    # Blob gambar lama di-defer secara default; lihat AnalysisReportQuerySet.with_images()
+    objects = AnalysisReportManager()
+    
+    @classmethod
+    def image_field(cls, field_type, suffix):
+        """Nama field dokumentasi, mis. image_field('sebelum', 'sha256')"""
+        if field_type not in cls.IMAGE_FIELD_TYPES:
+            raise ValueError(f"Invalid field type: {field_type!r}")
+        return f"dokumentasi_{field_type}_{suffix}"
+    
     def save_image_to_database(self, image_file, field_type):
         """
-        Menyimpan gambar ke database dengan processing menggunakan Pillow
+        Memproses gambar upload menggunakan Pillow lalu menyimpannya ke image store
         field_type: 'sebelum' atau 'sesudah'
         """
         if not image_file:
             return
             
-        # Process gambar dengan Pillow
-        processed_image_data = process_image_for_database(image_file)
-        if not processed_image_data:
+        # Process gambar dengan Pillow menjadi semua rendition
+        renditions = process_image_renditions(image_file)
+        if not renditions:
             return
             
         # Generate filename
         filename = generate_image_filename(self.foreman, self.report_date, field_type)
-        
-        # Simpan ke field yang sesuai
-        if field_type == 'sebelum':
-            self.dokumentasi_sebelum_data = processed_image_data
-            self.dokumentasi_sebelum_filename = filename
-            self.dokumentasi_sebelum_content_type = 'image/jpeg'
-        elif field_type == 'sesudah':
-            self.dokumentasi_sesudah_data = processed_image_data
-            self.dokumentasi_sesudah_filename = filename
-            self.dokumentasi_sesudah_content_type = 'image/jpeg'
-    
-    def get_image_base64(self, field_type):
+        self.set_image(field_type, renditions.pop(BASE_RENDITION), filename, renditions=renditions)
+    
+    def set_image(self, field_type, data, filename, content_type='image/jpeg', renditions=None):
         """
-        Mengambil gambar dalam format base64 untuk ditampilkan di template
-        field_type: 'sebelum' atau 'sesudah'
+        Simpan bytes gambar (beserta rendition yang lebih kecil, bila ada) ke
+        image store dan isi metadata gambar dasar di baris ini (hash, ukuran,
+        dimensi). Blob lama di database dikosongkan.
         """
-        if field_type == 'sebelum' and self.dokumentasi_sebelum_data:
-            return base64.b64encode(self.dokumentasi_sebelum_data).decode('utf-8')
-        elif field_type == 'sesudah' and self.dokumentasi_sesudah_data:
-            return base64.b64encode(self.dokumentasi_sesudah_data).decode('utf-8')
-        return None
+        info = get_image_store().save(data, renditions)
+        setattr(self, self.image_field(field_type, 'sha256'), info.sha256)
+        setattr(self, self.image_field(field_type, 'size'), info.size)
+        setattr(self, self.image_field(field_type, 'width'), info.width)
+        setattr(self, self.image_field(field_type, 'height'), info.height)
+        setattr(self, self.image_field(field_type, 'filename'), filename)
+        setattr(self, self.image_field(field_type, 'content_type'), content_type)
+        setattr(self, self.image_field(field_type, 'data'), None)
+        return info
+    
+    def image_version(self, field_type):
+        """Potongan hash gambar untuk URL versioned (None bila belum di image store)"""
+        sha256 = getattr(self, self.image_field(field_type, 'sha256'))
+        return sha256[:16] if sha256 else None
     
-    def get_image_data_url(self, field_type):
+    def image_url(self, field_type, size=None):
         """
-        Mengambil gambar dalam format data URL untuk ditampilkan langsung di HTML
-        field_type: 'sebelum' atau 'sesudah'
+        URL gambar dokumentasi, opsional rendition `size` (thumb/medium/print).
+        Parameter ?v=<hash> berubah setiap isi gambar berubah, sehingga browser
+        boleh meng-cache URL ini dalam waktu lama.
         """
-        base64_data = self.get_image_base64(field_type)
-        if base64_data:
-            content_type = (self.dokumentasi_sebelum_content_type if field_type == 'sebelum' 
-                          else self.dokumentasi_sesudah_content_type)
-            return f"data:{content_type};base64,{base64_data}"
-        return None
+        url = reverse('serve_analysis_report_image', args=[self.pk, field_type])
+        params = {}
+        if size:
+            params['size'] = size
+        version = self.image_version(field_type)
+        if version:
+            params['v'] = version
+        return f"{url}?{urlencode(params)}" if params else url
+    
+    def has_image(self, field_type):
+        """Apakah dokumentasi ada, di image store maupun masih di database"""
+        if getattr(self, self.image_field(field_type, 'sha256')):
+            return True
+        # Pakai anotasi with_image_flags() bila ada, supaya blob yang di-defer tidak di-load
+        flag = self.__dict__.get(f"has_dokumentasi_{field_type}")
+        if flag is not None:
+            return bool(flag)
+        return bool(getattr(self, self.image_field(field_type, 'data')))
+    
+    def open_image(self, field_type, size=None):
+        """
+        File object biner gambar dokumentasi (rendition `size` bila diminta),
+        atau None bila tidak ada. Blob lama selalu dikembalikan apa adanya.
+        """
+        sha256 = getattr(self, self.image_field(field_type, 'sha256'))
+        if sha256:
+            return get_image_store().open_rendition(sha256, size)
+        data = getattr(self, self.image_field(field_type, 'data'))
+        return io.BytesIO(bytes(data)) if data else None
+    
+    def get_image_bytes(self, field_type, size=None):
+        """Isi gambar dokumentasi dalam bytes, atau None bila tidak ada"""
+        image = self.open_image(field_type, size)
+        if image is None:
+            return None
+        with image:
+            return image.read()
     
     def get_faktor_4m1e_list(self):
         """Return list of selected 4M1E factors"""
@@ -658,6 +847,11 @@ class AnalysisReport(models.Model):
         verbose_name = "Analysis Report"
         verbose_name_plural = "Analysis Reports"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=["foreman", "-report_date"], name="dashboard_an_foreman_date_idx"),
+            models.Index(fields=["status", "-report_date"], name="dashboard_an_status_date_idx"),
+            models.Index(fields=["-created_at"], name="dashboard_an_created_idx"),
+        ]
 
 
 class Notification(models.Model):
@@ -667,6 +861,14 @@ class Notification(models.Model):
         ('unread', 'Belum Dibaca'),
         ('read', 'Sudah Dibaca'),
     ]
+
+    # Jenis pengingat; bersama recipient & key_date menjadi idempotency key
+    KIND_CHOICES = [
+        ('', 'Umum'),
+        ('report_reminder', 'Pengingat Activity Report'),
+        ('pre_deadline_shift1', 'Pengingat H-1 Jam Shift 1'),
+        ('pre_deadline_shift2', 'Pengingat H-1 Jam Shift 2'),
+    ]
     
     # Target penerima notifikasi
     recipient = models.ForeignKey(
@@ -701,26 +903,98 @@ class Notification(models.Model):
         related_name='sent_notifications',
         help_text="Admin yang mengirim notifikasi"
     )
+
+    # Idempotency key pengingat: satu notifikasi per (penerima, jenis, tanggal)
+    kind = models.CharField(
+        max_length=30,
+        choices=KIND_CHOICES,
+        blank=True,
+        default='',
+        help_text="Jenis pengingat (kosong untuk notifikasi umum)"
+    )
+    key_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Tanggal pengingat; bila diisi notifikasi tidak akan dikirim dua kali"
+    )
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Notifikasi"
         verbose_name_plural = "Notifikasi"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'key_date', 'recipient'],
+                condition=models.Q(key_date__isnull=False),
+                name='dashboard_n_idempotency_key',
+            ),
+        ]
         indexes = [
             models.Index(fields=['recipient', 'status']),
             models.Index(fields=['created_at']),
+            # Daftar notifikasi per user (terbaru dulu)
+            models.Index(fields=['recipient', '-created_at'], name='dashboard_n_recipient_created'),
         ]
     
     def __str__(self):
         return f"{self.title} - {self.recipient.name} ({self.status})"
     
     def mark_as_read(self):
-        """Tandai notifikasi sebagai sudah dibaca"""
+        """
+        Tandai notifikasi sebagai sudah dibaca. Lewat UPDATE bersyarat di
+        mark_all_read supaya dua request bersamaan tidak mengurangi counter dua kali.
+        """
         if self.status == 'unread':
-            self.status = 'read'
-            self.read_at = timezone.now()
-            self.save()
-    
+            Notification.mark_all_read(self.recipient_id, ids=[self.pk])
+            self.refresh_from_db(fields=["status", "read_at"])
+            # Counter sudah dikurangi oleh UPDATE di atas; save()/delete() berikutnya
+            # tidak boleh menguranginya lagi
+            self._unread_recipient = None
+
+    @classmethod
+    def _not_yet_sent(cls, recipient_ids, kind, key_date):
+        """Penerima yang belum punya notifikasi dengan idempotency key (kind, key_date)"""
+        already_sent = set(
+            cls.objects.filter(kind=kind, key_date=key_date, recipient_id__in=recipient_ids)
+            .values_list("recipient_id", flat=True)
+        )
+        return [recipient_id for recipient_id in recipient_ids if recipient_id not in already_sent]
+
+    @classmethod
+    def mark_all_read(cls, recipient, ids=None):
+        """
+        Tandai notifikasi belum dibaca milik `recipient` (User atau id) dengan
+        satu UPDATE; bila `ids` diisi hanya notifikasi dengan id tersebut.
+        Id milik user lain diabaikan. Mengembalikan jumlah notifikasi yang diperbarui.
+        """
+        recipient_id = getattr(recipient, "pk", recipient)
+        unread = cls.objects.filter(recipient_id=recipient_id, status="unread")
+        if ids is not None:
+            unread = unread.filter(id__in=ids)
+        with transaction.atomic():
+            updated = unread.update(
+                status="read",
+                read_at=timezone.now(),
+            )
+            if updated:
+                # .update() tidak memicu post_save, jadi counter & versi diperbarui manual
+                NotificationCounter.bump({recipient_id: -updated})
+                notification_changed([recipient_id], {"reason": "updated"})
+        return updated
+
+    @classmethod
+    def expired(cls, read_days, unread_days=None, now=None):
+        """
+        Queryset notifikasi yang melewati masa retensi: sudah dibaca dan lebih
+        tua dari `read_days` hari, serta (bila `unread_days` diisi) belum dibaca
+        dan lebih tua dari `unread_days` hari.
+        """
+        now = now or timezone.now()
+        condition = models.Q(status="read", created_at__lt=now - timedelta(days=read_days))
+        if unread_days is not None:
+            condition |= models.Q(status="unread", created_at__lt=now - timedelta(days=unread_days))
+        return cls.objects.filter(condition)
+
     @classmethod
     def create_broadcast_notification(cls, title, message, recipients, created_by):
         """Buat notifikasi broadcast untuk multiple recipients"""
@@ -735,6 +1009,623 @@ class Notification(models.Model):
             notifications.append(notification)
         return notifications
 
+    @classmethod
+    def bulk_broadcast(cls, title, message, recipients, created_by=None, batch_size=500,
+                       kind="", key_date=None):
+        """
+        Kirim notifikasi yang sama ke banyak penerima dengan bulk_create.
+
+        `recipients` boleh berisi User atau id user (termasuk queryset).
+        Insert dipecah per `batch_size` baris dalam satu transaksi.
+        Bila `key_date` diisi, (penerima, `kind`, `key_date`) menjadi
+        idempotency key: penerima yang sudah punya notifikasi dengan key yang
+        sama dilewati dan insert mengabaikan konflik, sehingga restart
+        scheduler atau klik ganda tidak menambah baris; run ulang tanpa
+        penerima baru hanya menjalankan satu SELECT ber-index. Outbox Telegram,
+        counter dan event perubahan hanya memakai baris yang benar-benar
+        ter-insert (dibaca ulang dari database, karena ignore_conflicts tidak
+        mengisi pk).
+        Mengembalikan jumlah notifikasi yang dibuat.
+        """
+        created_by_id = getattr(created_by, "pk", created_by)
+        recipient_ids = [getattr(recipient, "pk", recipient) for recipient in recipients]
+        if key_date is not None:
+            recipient_ids = list(dict.fromkeys(recipient_ids))
+            # Prefilter tanpa lock: run ulang yang idempoten cukup satu SELECT ber-index
+            recipient_ids = cls._not_yet_sent(recipient_ids, kind, key_date)
+        if not recipient_ids:
+            return 0
+
+        with transaction.atomic():
+            if key_date is not None:
+                # Kunci baris counter penerima (urut id) supaya pengirim paralel dengan
+                # key yang sama berjalan bergantian; baris yang belum ada dibuat dulu
+                locked = NotificationCounter.lock(recipient_ids)
+                missing = [recipient_id for recipient_id in recipient_ids if recipient_id not in locked]
+                if missing:
+                    NotificationCounter._initialize(missing)
+                    NotificationCounter.lock(missing)
+                # Cek ulang di dalam lock: pengirim lain mungkin baru saja commit
+                recipient_ids = cls._not_yet_sent(recipient_ids, kind, key_date)
+                if not recipient_ids:
+                    return 0
+
+            notifications = [
+                cls(
+                    recipient_id=recipient_id,
+                    title=title,
+                    message=message,
+                    created_by_id=created_by_id,
+                    kind=kind,
+                    key_date=key_date,
+                )
+                for recipient_id in recipient_ids
+            ]
+            if key_date is None:
+                cls.objects.bulk_create(notifications, batch_size=batch_size)
+            else:
+                # ON CONFLICT DO NOTHING tetap menjadi pengaman terakhir; karena objek
+                # tidak mendapat pk, baris yang benar-benar dibuat dibaca ulang per key
+                cls.objects.bulk_create(notifications, batch_size=batch_size, ignore_conflicts=True)
+                notifications = list(
+                    cls.objects.filter(
+                        kind=kind, key_date=key_date, recipient_id__in=recipient_ids,
+                        title=title, created_by_id=created_by_id,
+                    ).order_by("id")
+                )
+            created_ids = [notification.recipient_id for notification in notifications]
+            if not created_ids:
+                return 0
+            TelegramOutbox.enqueue(notifications)
+            # bulk_create tidak memicu post_save, jadi versi & stream diperbarui manual
+            # ... begitu juga counter belum dibaca
+            NotificationCounter.bump(Counter(created_ids))
+            notification_changed(created_ids, {"reason": "created"})
+        return len(notifications)
+
+
+class NotificationCounter(models.Model):
+    """
+    Jumlah notifikasi belum dibaca per user.
+
+    Badge notifikasi dibaca dari sini (satu lookup primary key) alih-alih
+    COUNT ke tabel notifikasi. Dijaga sinkron oleh signal Notification dan
+    oleh jalur bulk (broadcast, tandai semua dibaca) dengan UPDATE atomik.
+    Baris yang belum ada diisi dari tabel notifikasi saat pertama dibutuhkan.
+    Jalankan `python manage.py rebuild_notification_counters` untuk menghitung ulang.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_counter",
+    )
+    unread = models.IntegerField(default=0)
+    # Versi notifikasi user untuk ETag API notifikasi (lihat NotificationVersion)
+    version = models.BigIntegerField(default=version_seed)
+
+    class Meta:
+        verbose_name = "Notification Counter"
+        verbose_name_plural = "Notification Counters"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+    @staticmethod
+    def _count_unread(user_ids=None):
+        qs = Notification.objects.filter(status="unread")
+        if user_ids is not None:
+            qs = qs.filter(recipient_id__in=user_ids)
+        return dict(
+            qs.order_by()
+            .values("recipient_id")
+            .annotate(total=models.Count("id"))
+            .values_list("recipient_id", "total")
+        )
+
+    @classmethod
+    def _initialize(cls, user_ids):
+        """Buat baris counter yang belum ada, dihitung dari tabel notifikasi"""
+        counts = cls._count_unread(user_ids)
+        cls.objects.bulk_create(
+            [cls(user_id=user_id, unread=counts.get(user_id, 0)) for user_id in user_ids],
+            ignore_conflicts=True,
+        )
+        return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+    @classmethod
+    def lock(cls, user_ids):
+        """SELECT ... FOR UPDATE baris counter (urut id); return set id yang terkunci"""
+        return set(
+            cls.objects.select_for_update()
+            .filter(user_id__in=user_ids)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        """Baris counter milik user (User atau id); dibuat dari tabel notifikasi bila belum ada"""
+        user_id = getattr(user, "pk", user)
+        counter = cls.objects.filter(user_id=user_id).first()
+        if counter is None:
+            counter = cls(user_id=user_id, unread=cls._count_unread([user_id]).get(user_id, 0))
+            cls.objects.bulk_create([counter], ignore_conflicts=True)
+        return counter
+
+    @classmethod
+    def unread_for(cls, user):
+        """Jumlah notifikasi belum dibaca milik user (User atau id)"""
+        user_id = getattr(user, "pk", user)
+        unread = cls.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+        if unread is None:
+            unread = cls._initialize([user_id])[user_id]
+        return max(unread, 0)
+
+    @classmethod
+    def total(cls):
+        """Jumlah seluruh notifikasi belum dibaca (semua user)"""
+        return cls.objects.aggregate(total=Sum("unread"))["total"] or 0
+
+    @classmethod
+    def bump(cls, deltas):
+        """
+        Tambah/kurangi counter secara atomik (UPDATE ... SET unread = unread + delta).
+
+        `deltas` berupa mapping {user_id: delta}. User dengan delta yang sama
+        diperbarui dalam satu UPDATE. Baris yang belum ada tidak ditambah,
+        melainkan dihitung dari tabel notifikasi (yang sudah memuat perubahan ini).
+        """
+        deltas = {user_id: delta for user_id, delta in deltas.items() if user_id and delta}
+        if not deltas:
+            return
+        existing = set(
+            cls.objects.filter(user_id__in=deltas).values_list("user_id", flat=True)
+        )
+        by_delta = {}
+        for user_id in existing:
+            by_delta.setdefault(deltas[user_id], []).append(user_id)
+        for delta, user_ids in by_delta.items():
+            cls.objects.filter(user_id__in=user_ids).update(unread=F("unread") + delta)
+        missing = [user_id for user_id in deltas if user_id not in existing]
+        if missing:
+            cls._initialize(missing)
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """Hitung ulang seluruh counter dari tabel notifikasi. Return jumlah baris counter."""
+        rows = [
+            cls(user_id=user_id, unread=unread)
+            for user_id, unread in cls._count_unread().items()
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+
+class NotificationArchive(models.Model):
+    """
+    Arsip ringkas notifikasi yang sudah melewati masa retensi.
+
+    Diisi oleh `python manage.py archive_notifications` supaya tabel
+    Notification (dan index recipient/status-nya) tetap kecil. Primary key
+    memakai id notifikasi asli sehingga menjalankan ulang arsip aman.
+    Tabel ini sengaja hanya punya satu index tambahan (per penerima).
+    """
+
+    ARCHIVE_FIELDS = ("id", "recipient_id", "created_by_id", "title", "message", "status", "created_at", "read_at")
+
+    id = models.BigIntegerField(primary_key=True, help_text="ID notifikasi asli")
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_notifications",
+        db_index=False,
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        db_index=False,
+    )
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=Notification.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Arsip Notifikasi"
+        verbose_name_plural = "Arsip Notifikasi"
+        indexes = [
+            models.Index(fields=["recipient", "-created_at"], name="dashboard_na_recipient_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.recipient_id} ({self.status}, arsip)"
+
+    @classmethod
+    def archive_batch(cls, notifications, delete_only=False):
+        """
+        Pindahkan satu batch notifikasi (queryset Notification) ke arsip, atau
+        hapus saja bila `delete_only`, dalam satu transaksi. Baris dibaca ulang
+        dengan SELECT ... FOR UPDATE di dalam transaksi, jadi status yang
+        dipakai untuk mengurangi counter belum dibaca sama dengan yang dihapus.
+        Return jumlah baris.
+        """
+        with transaction.atomic():
+            rows = list(
+                notifications.select_for_update().order_by("id").values(*cls.ARCHIVE_FIELDS)
+            )
+            if not rows:
+                return 0
+            ids = [row["id"] for row in rows]
+            if not delete_only:
+                cls.objects.bulk_create([cls(**row) for row in rows], ignore_conflicts=True)
+            # DELETE langsung satu query tanpa memuat instance maupun signal counter;
+            # referensi outbox (on_delete=SET_NULL) dikosongkan manual lebih dulu
+            TelegramOutbox.objects.filter(notification_id__in=ids).update(notification=None)
+            deleted = Notification.objects.filter(pk__in=ids)
+            deleted._raw_delete(deleted.db)
+            unread = Counter(row["recipient_id"] for row in rows if row["status"] == "unread")
+            NotificationCounter.bump({recipient_id: -count for recipient_id, count in unread.items()})
+            notification_changed({row["recipient_id"] for row in rows}, {"reason": "archived"})
+        return len(ids)
+
+
+class TelegramOutbox(models.Model):
+    """
+    Antrian pesan Telegram yang belum terkirim (pola outbox).
+
+    Baris dibuat dalam transaksi yang sama dengan notifikasinya, lalu
+    dikirim oleh `python manage.py telegram_worker` di proses terpisah,
+    sehingga request tidak pernah menunggu Bot API. Pesan menyimpan chat id
+    dan teksnya sendiri supaya worker tidak perlu join ke tabel lain.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Menunggu"),
+        ("sending", "Sedang Dikirim"),
+        ("sent", "Terkirim"),
+        ("failed", "Gagal"),
+    ]
+
+    notification = models.ForeignKey(
+        Notification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="telegram_messages",
+    )
+    chat_id = models.CharField(max_length=50)
+    text = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    # Untuk status pending: jadwal kirim (backoff); untuk sending: batas lease worker
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Telegram Outbox"
+        verbose_name_plural = "Telegram Outbox"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="dashboard_tg_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id} - {self.status} ({self.attempts}x)"
+
+    @staticmethod
+    def format_text(notification):
+        return f"<b>{escape(notification.title)}</b>\n{escape(notification.message)}"
+
+    @classmethod
+    def enqueue(cls, notifications):
+        """
+        Antrekan pesan Telegram untuk notifikasi yang penerimanya punya
+        telegram_chat_id. No-op (tanpa query) bila TELEGRAM_DELIVERY_ENABLED mati.
+        Return jumlah pesan yang diantrekan.
+        """
+        if not settings.TELEGRAM_DELIVERY_ENABLED or not notifications:
+            return 0
+        chat_ids = dict(
+            User.objects.filter(pk__in={n.recipient_id for n in notifications})
+            .exclude(telegram_chat_id__isnull=True)
+            .exclude(telegram_chat_id="")
+            .values_list("pk", "telegram_chat_id")
+        )
+        messages = [
+            cls(
+                notification_id=notification.pk,
+                chat_id=chat_ids[notification.recipient_id],
+                text=cls.format_text(notification),
+            )
+            for notification in notifications
+            if notification.recipient_id in chat_ids
+        ]
+        cls.objects.bulk_create(messages, batch_size=500)
+        return len(messages)
+
+
+class ReportDailyStats(models.Model):
+    """
+    Rollup jumlah laporan per foreman, tanggal, jenis laporan dan status.
+
+    Dijaga tetap sinkron oleh signal ActivityReport/AnalysisReport sehingga
+    counter dashboard tidak perlu COUNT ke tabel laporan yang terus membesar.
+    Jalankan `python manage.py rebuild_report_stats` untuk menghitung ulang.
+    """
+
+    REPORT_TYPE_CHOICES = [
+        ("activity", "Activity Report"),
+        ("analysis", "Analysis Report"),
+    ]
+
+    foreman = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="report_daily_stats",
+        limit_choices_to={"role": "foreman"},
+    )
+    date = models.DateField(help_text="Tanggal laporan")
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Report Daily Stats"
+        verbose_name_plural = "Report Daily Stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["foreman", "date", "report_type", "status"],
+                name="dashboard_rds_unique_key",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["report_type", "status", "date"], name="dashboard_rds_type_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.foreman_id} - {self.date} - {self.report_type}/{self.status}: {self.count}"
+
+    @classmethod
+    def bump(cls, foreman_id, date, report_type, status, delta):
+        """Tambah/kurangi counter secara atomik (UPDATE ... SET count = count + delta)"""
+        if not foreman_id or not date or not status or not delta:
+            return
+        key = {
+            "foreman_id": foreman_id,
+            "date": date,
+            "report_type": report_type,
+            "status": status,
+        }
+        updated = cls.objects.filter(**key).update(count=F("count") + delta)
+        if updated or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(count=delta, **key)
+        except IntegrityError:
+            # Baris dibuat oleh request lain di antara UPDATE dan INSERT
+            cls.objects.filter(**key).update(count=F("count") + delta)
+
+    @classmethod
+    def total(cls, **filters):
+        """Jumlah laporan dari rollup sesuai filter (contoh: report_type='activity', status='pending')"""
+        return cls.objects.filter(**filters).aggregate(total=Sum("count"))["total"] or 0
+
+    @classmethod
+    def rebuild(cls, batch_size=1000):
+        """Hitung ulang seluruh rollup dari tabel laporan. Return jumlah baris rollup."""
+        rows = []
+        for report_type, model, date_field in (
+            ("activity", ActivityReport, "date"),
+            ("analysis", AnalysisReport, "report_date"),
+        ):
+            grouped = (
+                model.objects.order_by()
+                .values("foreman_id", date_field, "status")
+                .annotate(total=models.Count("id"))
+            )
+            for row in grouped.iterator():
+                rows.append(cls(
+                    foreman_id=row["foreman_id"],
+                    date=row[date_field],
+                    report_type=report_type,
+                    status=row["status"],
+                    count=row["total"],
+                ))
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=batch_size)
+        return len(rows)
+
+
+class ComplianceSnapshot(models.Model):
+    """
+    Rekap kepatuhan pengisian activity report per tanggal dan shift.
+
+    Foreman yang diharapkan mengisi diambil dari ShiftSchedule tanggal itu
+    (jadwal "Stop" tidak dihitung). Snapshot final diambil saat deadline shift
+    oleh notification_scheduler; snapshot sementara hari berjalan disegarkan
+    oleh notification center bila sudah terlalu lama. Dibuat lewat
+    ReportComplianceService.snapshot().
+    """
+
+    SHIFT_CHOICES = [
+        (1, "Shift 1"),
+        (2, "Shift 2"),
+    ]
+    # Deadline pengisian per shift (Shift 2 berakhir keesokan harinya)
+    SHIFT_DEADLINES = {1: "18:00", 2: "05:00"}
+
+    date = models.DateField(help_text="Tanggal laporan")
+    shift = models.IntegerField(choices=SHIFT_CHOICES)
+    expected = models.PositiveIntegerField(default=0, help_text="Foreman yang dijadwalkan")
+    submitted = models.PositiveIntegerField(default=0, help_text="Foreman yang sudah mengisi")
+    missing_foremen = models.JSONField(default=list, blank=True, help_text="ID foreman yang belum mengisi")
+    is_final = models.BooleanField(default=False, help_text="Diambil setelah deadline shift")
+    taken_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Compliance Snapshot"
+        verbose_name_plural = "Compliance Snapshots"
+        ordering = ["-date", "shift"]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "shift"], name="dashboard_cs_date_shift"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_shift_display()}: {self.submitted}/{self.expected}"
+
+    @property
+    def missing(self):
+        return self.expected - self.submitted
+
+    @property
+    def compliance_rate(self):
+        """Persentase foreman yang sudah mengisi (100 bila tidak ada yang dijadwalkan)"""
+        return round(self.submitted * 100 / self.expected) if self.expected else 100
+
+    @property
+    def deadline(self):
+        return self.SHIFT_DEADLINES[self.shift]
+
+
+# Field laporan yang menentukan baris rollup: (foreman, tanggal, status)
+REPORT_STATS_FIELDS = {
+    ActivityReport: ("activity", "date"),
+    AnalysisReport: ("analysis", "report_date"),
+}
+
+
+def _report_stats_key(instance):
+    report_type, date_field = REPORT_STATS_FIELDS[type(instance)]
+    # Baca dari __dict__ supaya field yang di-defer tidak memicu query tambahan
+    values = instance.__dict__
+    return (values.get("foreman_id"), values.get(date_field), report_type, values.get("status"))
+
+
+def remember_report_stats_key(sender, instance, **kwargs):
+    instance._report_stats_key = _report_stats_key(instance) if instance.pk else None
+
+
+def update_report_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new_key = _report_stats_key(instance)
+    old_key = None if created else getattr(instance, "_report_stats_key", None)
+    if old_key != new_key:
+        if old_key:
+            ReportDailyStats.bump(*old_key, delta=-1)
+        ReportDailyStats.bump(*new_key, delta=1)
+    instance._report_stats_key = new_key
+
+
+def update_report_stats_on_delete(sender, instance, **kwargs):
+    key = getattr(instance, "_report_stats_key", None) or _report_stats_key(instance)
+    ReportDailyStats.bump(*key, delta=-1)
+
+
+REPORT_STATS_SIGNALS = [
+    (post_init, remember_report_stats_key),
+    (post_save, update_report_stats_on_save),
+    (post_delete, update_report_stats_on_delete),
+]
+
+
+def connect_report_stats_signals():
+    for report_model in REPORT_STATS_FIELDS:
+        for signal, handler in REPORT_STATS_SIGNALS:
+            signal.connect(handler, sender=report_model)
+
+
+@contextmanager
+def report_stats_paused():
+    """
+    Lepas sementara signal rollup untuk operasi bulk (tanpa signal, Django bisa
+    menghapus laporan tanpa memuat tiap instance). Akhiri dengan ReportDailyStats.rebuild().
+    """
+    for report_model in REPORT_STATS_FIELDS:
+        for signal, handler in REPORT_STATS_SIGNALS:
+            signal.disconnect(handler, sender=report_model)
+    try:
+        yield
+    finally:
+        connect_report_stats_signals()
+
+
+connect_report_stats_signals()
+
+
+def _unread_recipient(instance):
+    # Penerima yang dihitung di counter (None bila sudah dibaca); baca dari __dict__
+    # supaya field yang di-defer tidak memicu query tambahan
+    values = instance.__dict__
+    return values.get("recipient_id") if values.get("status") == "unread" else None
+
+
+def remember_notification_recipient(sender, instance, **kwargs):
+    instance._unread_recipient = _unread_recipient(instance) if instance.pk else None
+
+
+def update_notification_counter_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else getattr(instance, "_unread_recipient", None)
+    new = _unread_recipient(instance)
+    if old != new:
+        deltas = Counter()
+        if old:
+            deltas[old] -= 1
+        if new:
+            deltas[new] += 1
+        NotificationCounter.bump(deltas)
+    instance._unread_recipient = new
+
+
+def update_notification_counter_on_delete(sender, instance, **kwargs):
+    recipient_id = getattr(instance, "_unread_recipient", None) or _unread_recipient(instance)
+    if recipient_id:
+        NotificationCounter.bump({recipient_id: -1})
+
+
+NOTIFICATION_COUNTER_SIGNALS = [
+    (post_init, remember_notification_recipient),
+    (post_save, update_notification_counter_on_save),
+    (post_delete, update_notification_counter_on_delete),
+]
+
+
+def connect_notification_counter_signals():
+    for signal, handler in NOTIFICATION_COUNTER_SIGNALS:
+        signal.connect(handler, sender=Notification)
+
+
+@contextmanager
+def notification_counter_paused():
+    """
+    Lepas sementara signal counter notifikasi untuk operasi bulk.
+    Akhiri dengan NotificationCounter.rebuild().
+    """
+    for signal, handler in NOTIFICATION_COUNTER_SIGNALS:
+        signal.disconnect(handler, sender=Notification)
+    try:
+        yield
+    finally:
+        connect_notification_counter_signals()
+
+
+connect_notification_counter_signals()
+
 
 # Pastikan jadwal terkait dibersihkan sebelum user dihapus (untuk menghindari ForeignKeyViolation di beberapa DB)
 @receiver(pre_delete, sender=User)
@@ -745,3 +1636,17 @@ def cleanup_shifts_on_user_delete(sender, instance, **kwargs):
     except Exception:
         # Jangan blok proses delete jika ada masalah; biarkan DB menangani
         pass
+
+
+# Antrekan pesan Telegram untuk notifikasi baru, naikkan versi notifikasi & beri tahu
+# stream SSE setiap kali notifikasi dibuat / dibaca
+@receiver(post_save, sender=Notification)
+def publish_notification_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        TelegramOutbox.enqueue([instance])
+    notification_changed(
+        [instance.recipient_id],
+        {"reason": "created" if created else "updated", "id": instance.pk},
+    )
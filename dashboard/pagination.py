@@ -0,0 +1,150 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    """Token cursor rusak atau tidak cocok dengan ordering paginator"""
+
+
+class KeysetPage:
+    """Satu halaman hasil KeysetPaginator (API mirip django.core.paginator.Page)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Pagination berbasis keyset (cursor) untuk list yang terus bertambah.
+
+    Halaman berikutnya difilter dengan `WHERE (date, id) < (:date, :id)`
+    sehingga biaya halaman ke-N sama dengan halaman pertama: tidak ada OFFSET
+    dan tidak ada COUNT(*). Ordering harus unik (akhiri dengan "id") dan
+    semua field memakai arah yang sama, contoh ("-date", "-id").
+    """
+
+    def __init__(self, queryset, per_page, ordering=("-created_at", "-id")):
+        directions = {field.startswith("-") for field in ordering}
+        if len(directions) != 1:
+            raise ValueError("KeysetPaginator ordering fields must share one direction")
+
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip("-") for field in ordering)
+        self.descending = self.ordering[0].startswith("-")
+
+    def get_page(self, cursor=None):
+        """Halaman untuk cursor; cursor kosong/rusak dianggap halaman pertama"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def page(self, cursor=None):
+        if not cursor:
+            rows = list(self.queryset.order_by(*self.ordering)[: self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = rows[: self.per_page]
+            return self._build_page(rows, has_next=has_more, has_previous=False)
+
+        direction, values = self._decode(cursor)
+        backwards = direction == "p"
+
+        # Halaman sebelumnya diambil dengan ordering terbalik lalu dibalik lagi
+        ordering = self._reversed_ordering() if backwards else self.ordering
+        rows = list(
+            self.queryset.filter(self._seek(values, backwards)).order_by(*ordering)[
+                : self.per_page + 1
+            ]
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return self._build_page(rows, has_next=True, has_previous=has_more)
+        return self._build_page(rows, has_next=has_more, has_previous=True)
+
+    def _build_page(self, rows, has_next, has_previous):
+        next_cursor = self._encode("n", rows[-1]) if rows and has_next else None
+        previous_cursor = self._encode("p", rows[0]) if rows and has_previous else None
+        return KeysetPage(rows, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+    def _reversed_ordering(self):
+        return tuple(
+            field.lstrip("-") if field.startswith("-") else f"-{field}" for field in self.ordering
+        )
+
+    def _seek(self, values, backwards):
+        """
+        Kondisi "setelah baris cursor" untuk key komposit, diekspansi menjadi
+        (a < va) OR (a = va AND b < vb) ... supaya bisa memakai index (a, b).
+        """
+        lookup = "gt" if self.descending == backwards else "lt"
+        condition = Q()
+        for position, field in enumerate(self.fields):
+            step = Q(**{f"{field}__{lookup}": values[position]})
+            for previous_field, previous_value in zip(self.fields[:position], values):
+                step &= Q(**{previous_field: previous_value})
+            condition |= step
+        return condition
+
+    def _field_value(self, obj, field):
+        if isinstance(obj, dict):
+            return obj[field]
+        return getattr(obj, field)
+
+    def _encode(self, direction, obj):
+        values = []
+        for field in self.fields:
+            value = self._field_value(obj, field)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        payload = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            direction, raw_values = payload["d"], list(payload["v"])
+        except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+
+        if direction not in ("n", "p") or len(raw_values) != len(self.fields):
+            raise InvalidCursor(cursor)
+
+        # Konversi balik ke tipe Python sesuai field model (date, datetime, int)
+        opts = self.queryset.model._meta
+        try:
+            values = [
+                opts.get_field(field).to_python(value)
+                for field, value in zip(self.fields, raw_values)
+            ]
+        except (FieldDoesNotExist, ValidationError):
+            raise InvalidCursor(cursor)
+        return direction, values
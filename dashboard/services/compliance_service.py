@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import ActivityReport, ComplianceSnapshot, ShiftSchedule, User
+
+
+def shift_deadline(date, shift):
+    """Deadline pengisian report untuk shift pada tanggal tersebut (Shift 2: 05:00 keesokan harinya)"""
+    hour, minute = map(int, ComplianceSnapshot.SHIFT_DEADLINES[shift].split(":"))
+    deadline_date = date + timedelta(days=1) if shift == 2 else date
+    return timezone.make_aware(
+        datetime.combine(deadline_date, datetime.min.time()).replace(hour=hour, minute=minute)
+    )
+
+
+class ReportComplianceService:
+    """
+    Siapa saja foreman aktif yang belum mengisi activity report pada suatu tanggal.
+
+    Dihitung dengan satu anti-join (`NOT EXISTS`) di database, bukan satu
+    `.exists()` per foreman, sehingga jumlah query tetap berapa pun jumlah
+    foreman. Dipakai oleh notification center, broadcast notifikasi dan
+    scheduler pengingat.
+    """
+
+    def __init__(self, date):
+        self.date = date
+
+    def foremen(self, shift=None, department=None, leader=None):
+        """Foreman aktif, opsional difilter per shift, departemen dan leader"""
+        qs = User.objects.filter(role="foreman", is_active=True)
+        if shift:
+            qs = qs.filter(shift=shift)
+        if department:
+            qs = qs.filter(department=department)
+        if leader:
+            qs = qs.filter(leader=leader)
+        return qs
+
+    def _report_exists(self):
+        return Exists(
+            ActivityReport.objects.filter(foreman=OuterRef("pk"), date=self.date)
+        )
+
+    def missing_foremen(self, shift=None, department=None, leader=None):
+        """Queryset foreman yang belum punya activity report pada tanggal ini"""
+        return self.foremen(shift, department, leader).filter(~self._report_exists())
+
+    def submitted_foremen(self, shift=None, department=None, leader=None):
+        """Queryset foreman yang sudah punya activity report pada tanggal ini"""
+        return self.foremen(shift, department, leader).filter(self._report_exists())
+
+    def scheduled_foremen(self, shift):
+        """
+        Foreman aktif yang dijadwalkan bekerja pada `shift` di tanggal ini.
+
+        Shift diambil dari ShiftSchedule tanggal tersebut (jadwal "Stop"
+        otomatis tidak ikut); foreman tanpa jadwal aktif memakai User.shift.
+        """
+        schedule = ShiftSchedule.objects.filter(
+            foreman=OuterRef("pk"), date=self.date, is_active=True
+        ).values("shift")[:1]
+        return (
+            self.foremen()
+            .annotate(scheduled_shift=Coalesce(Subquery(schedule), F("shift")))
+            .filter(scheduled_shift=shift)
+        )
+
+    def shift_compliance(self, shift):
+        """
+        Rekap kepatuhan satu shift: dict expected, submitted dan
+        missing_ids (id foreman yang belum mengisi, urut nama).
+        Dihitung dengan satu query.
+        """
+        rows = list(
+            self.scheduled_foremen(shift)
+            .annotate(has_report=self._report_exists())
+            .order_by("name", "id")
+            .values_list("id", "has_report")
+        )
+        missing_ids = [foreman_id for foreman_id, has_report in rows if not has_report]
+        return {
+            "expected": len(rows),
+            "submitted": len(rows) - len(missing_ids),
+            "missing_ids": missing_ids,
+        }
+
+    def _build_snapshot(self, shift, final):
+        compliance = self.shift_compliance(shift)
+        return ComplianceSnapshot(
+            date=self.date,
+            shift=shift,
+            expected=compliance["expected"],
+            submitted=compliance["submitted"],
+            missing_foremen=compliance["missing_ids"],
+            is_final=final,
+        )
+
+    @staticmethod
+    def _save_snapshots(snapshots):
+        """Upsert snapshot per (date, shift) dalam satu query"""
+        ComplianceSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["date", "shift"],
+            update_fields=["expected", "submitted", "missing_foremen", "is_final", "taken_at"],
+        )
+
+    def snapshot(self, shift, final=False):
+        """
+        Simpan rekap kepatuhan shift ini ke ComplianceSnapshot dan kembalikan
+        barisnya. Snapshot yang sudah final tidak ditimpa snapshot sementara.
+        """
+        existing = ComplianceSnapshot.objects.filter(date=self.date, shift=shift).first()
+        if existing and existing.is_final and not final:
+            return existing
+        snapshot = self._build_snapshot(shift, final)
+        self._save_snapshots([snapshot])
+        return snapshot
+
+    def snapshots(self, max_age=None):
+        """
+        Snapshot semua shift pada tanggal ini, urut per shift. Snapshot yang
+        belum ada, atau snapshot sementara yang lebih tua dari `max_age`
+        (timedelta), dihitung ulang dan disimpan sekaligus.
+        """
+        current = {
+            snapshot.shift: snapshot
+            for snapshot in ComplianceSnapshot.objects.filter(date=self.date)
+        }
+        stale_before = timezone.now() - max_age if max_age is not None else None
+        refreshed = []
+        for shift, _ in ComplianceSnapshot.SHIFT_CHOICES:
+            snapshot = current.get(shift)
+            if snapshot is None or (
+                not snapshot.is_final and stale_before and snapshot.taken_at < stale_before
+            ):
+                current[shift] = self._build_snapshot(shift, final=False)
+                refreshed.append(current[shift])
+        if refreshed:
+            self._save_snapshots(refreshed)
+        return [current[shift] for shift, _ in ComplianceSnapshot.SHIFT_CHOICES]
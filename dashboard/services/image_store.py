@@ -0,0 +1,211 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from PIL import Image
+
+
+logger = logging.getLogger(__name__)
+
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Ukuran maksimum (lebar, tinggi) setiap rendition gambar dokumentasi.
+# Gambar dasar (yang hash-nya disimpan di baris) adalah rendition terbesar.
+RENDITIONS = {
+    "thumb": (320, 240),  # daftar laporan & admin
+    "medium": (800, 600),  # halaman validasi
+    "print": (1600, 1200),  # PDF
+}
+BASE_RENDITION = "print"
+
+
+class StoredImage(NamedTuple):
+    """Metadata gambar yang disimpan di baris database (bukan isinya)"""
+
+    sha256: str
+    size: int
+    width: int | None
+    height: int | None
+
+
+def describe_image(data):
+    """Hash SHA-256, ukuran byte dan dimensi gambar"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+    except Exception:
+        width = height = None
+    return StoredImage(hashlib.sha256(data).hexdigest(), len(data), width, height)
+
+
+def render_renditions(image_file, names=None, quality=85):
+    """
+    Buka gambar sekali lalu hasilkan JPEG untuk setiap rendition
+    (default semua). Return dict {nama: bytes}.
+    """
+    names = names or list(RENDITIONS)
+    with Image.open(image_file) as img:
+        # Convert ke RGB jika perlu (untuk PNG dengan transparency)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGB")
+        else:
+            img.load()
+
+        renditions = {}
+        for name in names:
+            rendition = img.copy()
+            rendition.thumbnail(RENDITIONS[name], Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            rendition.save(output, format="JPEG", quality=quality, optimize=True)
+            renditions[name] = output.getvalue()
+        return renditions
+
+
+class ImageStore:
+    """
+    Penyimpanan gambar content-addressed: setiap gambar dialamatkan dengan
+    hash SHA-256 isinya, sehingga gambar yang sama hanya disimpan sekali.
+    Rendition yang lebih kecil (RENDITIONS) disimpan di samping gambar dasar
+    dengan kunci hash yang sama.
+
+    Backend diganti lewat settings.IMAGE_STORE_BACKEND; subclass cukup
+    mengimplementasikan `_write`, `open`, `exists`, `delete` dan `hashes`.
+    """
+
+    def save(self, data, renditions=None):
+        """
+        Simpan bytes gambar dasar beserta rendition-nya ({nama: bytes})
+        dan kembalikan StoredImage gambar dasar.
+        """
+        info = describe_image(data)
+        if not self.exists(info.sha256):
+            self._write(info.sha256, data)
+        for name, rendition_data in (renditions or {}).items():
+            if name != BASE_RENDITION and not self.exists(info.sha256, name):
+                self._write(info.sha256, rendition_data, name)
+        return info
+
+    def read(self, sha256, rendition=None):
+        with self.open(sha256, rendition) as fh:
+            return fh.read()
+
+    def open_rendition(self, sha256, rendition=None):
+        """
+        Buka rendition gambar. Rendition yang belum ada (mis. gambar hasil
+        migrate_images_to_store) dibuat dari gambar dasar saat pertama diminta;
+        bila gagal, gambar dasar yang dikembalikan.
+        """
+        if rendition in (None, BASE_RENDITION):
+            return self.open(sha256)
+        if not self.exists(sha256, rendition):
+            with self.open(sha256) as base:
+                try:
+                    data = render_renditions(base, [rendition])[rendition]
+                except Exception:
+                    logger.exception("Cannot render %s rendition of image %s", rendition, sha256)
+                    return self.open(sha256)
+            self._write(sha256, data, rendition)
+        return self.open(sha256, rendition)
+
+    def _write(self, sha256, data, rendition=None):
+        raise NotImplementedError
+
+    def open(self, sha256, rendition=None):
+        """File object biner (read-only) untuk gambar dengan hash tersebut"""
+        raise NotImplementedError
+
+    def exists(self, sha256, rendition=None):
+        raise NotImplementedError
+
+    def delete(self, sha256):
+        """Hapus gambar dasar beserta semua rendition-nya"""
+        raise NotImplementedError
+
+    def hashes(self, older_than=None):
+        """
+        Iterasi hash semua gambar dasar di store; bila `older_than` (timestamp)
+        diisi, hanya gambar yang terakhir ditulis sebelum waktu tersebut.
+        """
+        raise NotImplementedError
+
+
+class FileSystemImageStore(ImageStore):
+    """
+    Gambar disimpan sebagai file di `root/ab/cd/<sha256>`, rendition di
+    `root/ab/cd/<sha256>.<nama>`. Penulisan lewat file sementara + rename
+    supaya pembaca tidak pernah melihat file setengah jadi.
+    """
+
+    def __init__(self, root=None):
+        self.root = str(root or settings.IMAGE_STORE_ROOT)
+
+    def path(self, sha256, rendition=None):
+        if not SHA256_RE.match(sha256 or ""):
+            raise ValueError(f"Invalid image hash: {sha256!r}")
+        if rendition not in (None, BASE_RENDITION) and rendition not in RENDITIONS:
+            raise ValueError(f"Invalid rendition: {rendition!r}")
+        path = os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+        return path if rendition in (None, BASE_RENDITION) else f"{path}.{rendition}"
+
+    def _write(self, sha256, data, rendition=None):
+        path = self.path(sha256, rendition)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def open(self, sha256, rendition=None):
+        return open(self.path(sha256, rendition), "rb")
+
+    def exists(self, sha256, rendition=None):
+        return os.path.exists(self.path(sha256, rendition))
+
+    def delete(self, sha256):
+        for rendition in [None, *RENDITIONS]:
+            try:
+                os.unlink(self.path(sha256, rendition))
+            except FileNotFoundError:
+                pass
+
+    def hashes(self, older_than=None):
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not SHA256_RE.match(filename):
+                    continue
+                if older_than is not None:
+                    try:
+                        if os.stat(os.path.join(directory, filename)).st_mtime >= older_than:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                yield filename
+
+
+@lru_cache(maxsize=None)
+def get_image_store():
+    """Instance image store sesuai settings.IMAGE_STORE_BACKEND"""
+    return import_string(settings.IMAGE_STORE_BACKEND)()
+
+
+@receiver(setting_changed)
+def _reset_image_store(setting, **kwargs):
+    if setting in ("IMAGE_STORE_BACKEND", "IMAGE_STORE_ROOT"):
+        get_image_store.cache_clear()
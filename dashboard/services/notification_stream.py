@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+
+class NotificationBroker:
+    """
+    Pub/sub in-process untuk stream notifikasi (Server-Sent Events).
+
+    Setiap koneksi SSE berlangganan dengan asyncio.Queue miliknya; publish
+    bisa dipanggil dari kode sync mana pun (signal, view, command) karena
+    event diteruskan ke event loop pelanggan lewat call_soon_threadsafe.
+
+    Broker ini hanya menjangkau koneksi di proses yang sama. Event dari
+    proses lain (mis. command notification_scheduler) ditangkap oleh resync
+    berkala di stream, bukan lewat broker.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id):
+        """Daftarkan koneksi baru; harus dipanggil dari dalam event loop"""
+        queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, event):
+        """Kirim event ke semua koneksi milik user (no-op bila tidak ada yang terhubung)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Event loop koneksi sudah ditutup
+                self.unsubscribe(user_id, (loop, queue))
+
+    def publish_on_commit(self, user_ids, event):
+        """Publish setelah transaksi commit, supaya stream membaca data yang sudah tersimpan"""
+        user_ids = [user_id for user_id in set(user_ids) if self.has_subscribers(user_id)]
+        if not user_ids:
+            return
+
+        def send():
+            for user_id in user_ids:
+                self.publish(user_id, event)
+
+        transaction.on_commit(send)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Klien lambat: event dibuang, resync berkala akan menyamakan lagi
+            pass
+
+
+notification_broker = NotificationBroker()
@@ -0,0 +1,55 @@
+import time
+
+from django.apps import apps
+from django.db.models import F
+
+from .notification_stream import notification_broker
+
+
+def version_seed():
+    """Versi awal baris counter baru: waktu sekarang dalam mikrodetik"""
+    return time.time_ns() // 1000
+
+
+class NotificationVersion:
+    """
+    Nomor versi notifikasi per user, disimpan di kolom NotificationCounter.version.
+
+    Naik setiap kali notifikasi user dibuat atau ditandai dibaca, sehingga
+    API notifikasi bisa menjawab 304 Not Modified dengan satu lookup primary
+    key selama versinya sama. Karena ada di database, semua proses worker
+    melihat versi yang sama. Baris counter baru diisi dari waktu sekarang
+    (version_seed), jadi rebuild counter tidak pernah mengulang nilai lama
+    yang mungkin masih dipegang klien sebagai ETag.
+    """
+
+    @staticmethod
+    def _counters():
+        # Lazy: models.py mengimpor modul ini
+        return apps.get_model("dashboard", "NotificationCounter")
+
+    @classmethod
+    def get(cls, user_id):
+        return cls._counters().for_user(user_id).version
+
+    @classmethod
+    def bump(cls, user_ids):
+        # User tanpa baris counter belum pernah memegang ETag; baris yang
+        # nanti dibuat untuknya langsung mendapat versi segar dari version_seed
+        cls._counters().objects.filter(user_id__in=user_ids).update(version=F("version") + 1)
+
+
+def notification_changed(user_ids, event):
+    """
+    Dipanggil setiap kali notifikasi milik `user_ids` berubah (dibuat / dibaca).
+
+    Versi dinaikkan di transaksi yang sama dengan perubahannya, jadi poll
+    yang berjalan bersamaan tidak pernah melihat ETag baru dengan data lama.
+    Stream SSE diberi tahu setelah commit.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    NotificationVersion.bump(user_ids)
+    notification_broker.publish_on_commit(user_ids, event)
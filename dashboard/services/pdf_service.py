@@ -361,15 +361,11 @@ class PDFReportService:
         """Add footer section dengan nama yang diisi dan total durasi jam kerja"""
         elements = []
         
-        # Calculate total duration from all activities
+        # Calculate total duration from all activities (kolom ringkasan total_duration_minutes)
         total_duration = 0.0
         if reports:
             for report in reports:
-                activities = report.activities.all()
-                for activity in activities:
-                    if activity.start_time and activity.stop_time:
-                        duration_hours = self._calculate_duration_hours(activity.start_time, activity.stop_time)
-                        total_duration += duration_hours
+                total_duration += report.total_duration_minutes / 60
         
         # Total Durasi section dengan nilai yang dihitung
         total_text = f"Total Durasi (Jam) : {total_duration:.1f} jam"
@@ -1218,24 +1214,22 @@ class PDFReportService:
         dokumentasi_sebelum_content = '<<DOKUMENTASI SEBELUM>>'
         dokumentasi_sesudah_content = '<<DOKUMENTASI SESUDAH>>'
         
-        # Try to get images from BinaryField data - dengan ukuran 2x lipat
-        if hasattr(report, 'dokumentasi_sebelum_data') and report.dokumentasi_sebelum_data:
-            sebelum_img = self._create_image_from_binary(
-                report.dokumentasi_sebelum_data, 
-                max_width=page_width/2 - 10*mm, 
-                max_height=50*mm  # Diperbesar dari 20mm ke 50mm (2.5x lipat)
-            )
-            if sebelum_img:
-                dokumentasi_sebelum_content = sebelum_img
-        
-        if hasattr(report, 'dokumentasi_sesudah_data') and report.dokumentasi_sesudah_data:
-            sesudah_img = self._create_image_from_binary(
-                report.dokumentasi_sesudah_data, 
-                max_width=page_width/2 - 10*mm, 
-                max_height=50*mm  # Diperbesar dari 20mm ke 50mm (2.5x lipat)
-            )
-            if sesudah_img:
-                dokumentasi_sesudah_content = sesudah_img
+        # Ambil rendition print dari image store (atau blob lama) - dengan ukuran 2x lipat
+        sebelum_img = self._create_image_from_binary(
+            report.get_image_bytes('sebelum', size='print'), 
+            max_width=page_width/2 - 10*mm, 
+            max_height=50*mm  # Diperbesar dari 20mm ke 50mm (2.5x lipat)
+        )
+        if sebelum_img:
+            dokumentasi_sebelum_content = sebelum_img
+        
+        sesudah_img = self._create_image_from_binary(
+            report.get_image_bytes('sesudah', size='print'), 
+            max_width=page_width/2 - 10*mm, 
+            max_height=50*mm  # Diperbesar dari 20mm ke 50mm (2.5x lipat)
+        )
+        if sesudah_img:
+            dokumentasi_sesudah_content = sesudah_img
         
         doc_content_data = [[dokumentasi_sebelum_content, dokumentasi_sesudah_content]]
         doc_content_table = Table(doc_content_data,
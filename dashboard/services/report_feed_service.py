@@ -0,0 +1,173 @@
+from django.db.models import CharField, DateTimeField, F, Value
+from django.db.models.functions import Cast, Coalesce
+
+from ..models import ActivityReport, AnalysisReport
+
+
+class FeedPage:
+    """Satu halaman feed (API mirip django.core.paginator.Page, tanpa total)"""
+
+    def __init__(self, object_list, number, per_page, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.per_page = per_page
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        return (self.number - 1) * self.per_page + 1 if self.object_list else 0
+
+    def end_index(self):
+        return (self.number - 1) * self.per_page + len(self.object_list)
+
+
+class ReportFeedService:
+    """
+    Feed gabungan Activity Report + Analysis Report untuk dashboard leader.
+
+    Kedua jenis laporan digabung di database dengan UNION, sehingga sorting,
+    filter dan pagination dikerjakan oleh DB dan jumlah query tetap walaupun
+    histori laporan terus bertambah. Data aktivitas pertama diambil dari kolom
+    ringkasan ActivityReport (first_unit_code, dll), tanpa join ke detail.
+    """
+
+    FEED_FIELDS = (
+        "report_id",
+        "report_type",
+        "feed_date",
+        "foreman_name",
+        "unit_code_value",
+        "component_value",
+        "activities_value",
+        "report_status",
+        "sort_key",
+    )
+
+    TITLE_MAX_LENGTH = 50
+
+    def __init__(self, leader):
+        self.leader = leader
+
+    def _activity_queryset(self, statuses=None, on_date=None):
+        qs = ActivityReport.objects.filter(foreman__leader=self.leader)
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        if on_date:
+            qs = qs.filter(date=on_date)
+
+        # Urutan annotate harus sama persis dengan sisi analysis agar kolom UNION sejajar
+        return qs.order_by().annotate(
+            report_id=F("id"),
+            report_type=Value("activity", output_field=CharField()),
+            feed_date=F("date"),
+            foreman_name=F("foreman__name"),
+            unit_code_value=F("first_unit_code"),
+            component_value=F("first_component"),
+            activities_value=F("first_activity_code"),
+            report_status=F("status"),
+            sort_key=Coalesce("created_at", Cast("date", DateTimeField())),
+        ).values(*self.FEED_FIELDS)
+
+    def _analysis_queryset(self, statuses=None, on_date=None):
+        qs = AnalysisReport.objects.filter(foreman__leader=self.leader)
+        if statuses:
+            qs = qs.filter(status__in=statuses)
+        if on_date:
+            qs = qs.filter(report_date=on_date)
+
+        return qs.order_by().annotate(
+            report_id=F("id"),
+            report_type=Value("analysis", output_field=CharField()),
+            feed_date=F("report_date"),
+            foreman_name=F("foreman__name"),
+            unit_code_value=F("unit_code"),
+            component_value=F("problem"),
+            activities_value=Cast("title_problem", CharField()),
+            report_status=F("status"),
+            sort_key=Coalesce("created_at", Cast("report_date", DateTimeField())),
+        ).values(*self.FEED_FIELDS)
+
+    def get_feed(self, statuses=None, on_date=None):
+        """UNION kedua jenis laporan, terbaru lebih dulu (belum dieksekusi)."""
+        activity_qs = self._activity_queryset(statuses=statuses, on_date=on_date)
+        analysis_qs = self._analysis_queryset(statuses=statuses, on_date=on_date)
+        return activity_qs.union(analysis_qs, all=True).order_by(
+            "-sort_key", "-report_id"
+        )
+
+    def paginate(self, feed, page_number, per_page=10):
+        """
+        Halaman feed dengan OFFSET, lalu ubah baris halaman aktif ke format template.
+        Mengambil `per_page + 1` baris untuk mengetahui ada tidaknya halaman
+        berikutnya, jadi tidak perlu COUNT atas UNION. Nomor halaman yang tidak
+        valid atau sudah lewat data dianggap halaman pertama.
+        """
+        try:
+            number = max(int(page_number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        offset = (number - 1) * per_page
+        rows = list(feed[offset:offset + per_page + 1])
+        if not rows and number > 1:
+            return self.paginate(feed, 1, per_page)
+        return FeedPage(
+            [self._to_row(row) for row in rows[:per_page]],
+            number,
+            per_page,
+            has_next=len(rows) > per_page,
+        )
+
+    def recent(self, limit=5):
+        return [self._to_row(row) for row in self.get_feed()[:limit]]
+
+    def _to_row(self, row):
+        problem_labels = dict(AnalysisReport.PROBLEM_CHOICES)
+        is_activity = row["report_type"] == "activity"
+
+        if is_activity:
+            component = row["component_value"] or "-"
+            activities = row["activities_value"] or "-"
+        else:
+            component = problem_labels.get(row["component_value"], "-")
+            title = row["activities_value"] or ""
+            activities = (
+                title[: self.TITLE_MAX_LENGTH] + "..."
+                if len(title) > self.TITLE_MAX_LENGTH
+                else title
+            )
+
+        return {
+            "id": row["report_id"],
+            "date": row["feed_date"],
+            "foreman_name": row["foreman_name"],
+            "unit_code": row["unit_code_value"] or "-",
+            "component": component,
+            "activities": activities,
+            "status": row["report_status"],
+            "report_type": row["report_type"],
+            "report_type_display": "Activity Report" if is_activity else "Analysis Report",
+            "validation_url": "leader_validation_activity"
+            if is_activity
+            else "leader_validation_analysis",
+            "created_at": row["sort_key"],
+        }
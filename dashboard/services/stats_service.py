@@ -0,0 +1,101 @@
+from datetime import timedelta
+from functools import cached_property
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from ..models import Notification, NotificationCounter, ReportDailyStats, User
+
+
+class ReportStatsService:
+    """
+    Counter dashboard untuk setiap role, dihitung dengan conditional aggregation.
+
+    Setiap kelompok counter laporan & user diambil dengan satu query
+    `aggregate()` berisi beberapa `Sum/Count(filter=Q(...))`, bukan satu
+    `.count()` per angka. Counter notifikasi berasal dari dua tabel berbeda
+    (lihat `notification_stats`).
+    Hasilnya di-cache per instance; gunakan `for_request()` supaya view,
+    template tag, dsb. dalam satu request memakai hasil yang sama.
+    """
+
+    VALIDATED_STATUSES = ("approved", "rejected")
+
+    def __init__(self, user, today=None):
+        self.user = user
+        self.today = today or timezone.now().date()
+        self.week_ago = self.today - timedelta(days=7)
+        self.month_start = self.today.replace(day=1)
+
+    @classmethod
+    def for_request(cls, request):
+        """Instance yang dipakai bersama selama satu request"""
+        service = getattr(request, "_report_stats_service", None)
+        if service is None:
+            service = cls(request.user)
+            request._report_stats_service = service
+        return service
+
+    @staticmethod
+    def _sum(condition):
+        return Sum("count", filter=condition, default=0)
+
+    @cached_property
+    def foreman_stats(self):
+        """Counter laporan milik foreman yang sedang login"""
+        activity = Q(report_type="activity")
+        return ReportDailyStats.objects.filter(foreman=self.user).aggregate(
+            total_reports=self._sum(activity),
+            today_reports=self._sum(activity & Q(date=self.today)),
+            this_week_reports=self._sum(activity & Q(date__gte=self.week_ago)),
+            this_month_reports=self._sum(activity & Q(date__gte=self.month_start)),
+            analysis_month_reports=self._sum(
+                Q(report_type="analysis", date__gte=self.month_start)
+            ),
+        )
+
+    @cached_property
+    def team_stats(self):
+        """Counter laporan seluruh foreman di bawah leader yang sedang login"""
+        return ReportDailyStats.objects.filter(foreman__leader=self.user).aggregate(
+            pending=self._sum(Q(status="pending")),
+            today=self._sum(Q(date=self.today)),
+            validated=self._sum(Q(status__in=self.VALIDATED_STATUSES)),
+        )
+
+    @cached_property
+    def global_stats(self):
+        """Counter activity report seluruh foreman (dashboard admin)"""
+        return ReportDailyStats.objects.filter(report_type="activity").aggregate(
+            pending=self._sum(Q(status="pending")),
+            validated=self._sum(Q(status__in=self.VALIDATED_STATUSES)),
+        )
+
+    @cached_property
+    def user_counts(self):
+        """Jumlah user per role; `team_foremen` relatif terhadap user yang login"""
+        foreman = Q(role="foreman")
+        return User.objects.aggregate(
+            total_users=Count("id"),
+            total_leaders=Count("id", filter=Q(role="leader")),
+            total_foremen=Count("id", filter=foreman),
+            active_foremen=Count("id", filter=foreman & Q(is_active=True)),
+            team_foremen=Count("id", filter=foreman & Q(leader=self.user)),
+        )
+
+    @cached_property
+    def unread_notifications(self):
+        """Jumlah notifikasi belum dibaca milik user yang login (dari NotificationCounter)"""
+        return NotificationCounter.unread_for(self.user)
+
+    @cached_property
+    def notification_stats(self):
+        """
+        Counter pusat notifikasi dalam dua query kecil: COUNT notifikasi yang
+        dikirim user ini (index created_by) dan SUM NotificationCounter untuk
+        total belum dibaca, supaya tabel notifikasi tidak di-scan penuh.
+        """
+        return {
+            "sent_by_me": Notification.objects.filter(created_by=self.user).count(),
+            "total_unread": NotificationCounter.total(),
+        }
@@ -0,0 +1,240 @@
+import http.client
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import TelegramOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramError(Exception):
+    """Kegagalan kirim ke Bot API; `permanent` berarti tidak perlu dicoba lagi"""
+
+    def __init__(self, message, retry_after=None, permanent=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.permanent = permanent
+
+
+class TelegramClient:
+    """
+    Klien `sendMessage` Bot API di atas http.client.
+
+    Setiap thread memakai satu koneksi keep-alive sendiri, jadi pesan dalam
+    satu batch tidak membuka koneksi TLS baru per pesan.
+    """
+
+    def __init__(self, token, api_base, timeout=10):
+        parts = urlsplit(api_base)
+        self.timeout = timeout
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = parts.netloc
+        self._path = f"{parts.path.rstrip('/')}/bot{token}/sendMessage"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connection_class(self._host, timeout=self.timeout)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.add(connection)
+        return connection
+
+    def _reset(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            with self._lock:
+                self._connections.discard(connection)
+
+    def _post(self, body):
+        # Koneksi keep-alive yang sudah ditutup server baru ketahuan saat dipakai:
+        # coba sekali lagi dengan koneksi baru sebelum dianggap gagal
+        reused = getattr(self._local, "connection", None) is not None
+        for _ in range(2 if reused else 1):
+            connection = self._connection()
+            try:
+                connection.request(
+                    "POST", self._path, body=body, headers={"Content-Type": "application/json"}
+                )
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                self._reset()
+                error = exc
+        raise TelegramError(f"Network error: {error}")
+
+    def send_message(self, chat_id, text):
+        body = json.dumps({
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "HTML",
+            "disable_web_page_preview": True,
+        })
+        status, payload = self._post(body)
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            data = {}
+        if status == 200 and data.get("ok"):
+            return
+        description = data.get("description") or f"HTTP {status}"
+        if status == 429:
+            retry_after = (data.get("parameters") or {}).get("retry_after", 1)
+            raise TelegramError(description, retry_after=retry_after)
+        # 4xx lain (chat tidak ditemukan, bot diblokir, teks tidak valid) tidak akan berhasil bila diulang
+        raise TelegramError(description, permanent=400 <= status < 500)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            connection.close()
+
+
+class RateLimiter:
+    """
+    Pembatas laju kirim yang aman dipakai banyak thread: jarak minimum
+    antar pesan secara global dan per chat. `reserve` memesan slot kirim
+    berikutnya sehingga thread yang menunggu tidak saling berebut.
+    """
+
+    def __init__(self, global_rate, per_chat_rate):
+        self.global_interval = 1.0 / global_rate
+        self.chat_interval = 1.0 / per_chat_rate
+        self._lock = threading.Lock()
+        self._next_global = 0.0
+        self._next_chat = {}
+
+    def reserve(self, chat_id):
+        """Pesan slot kirim untuk chat ini; return detik yang harus ditunggu"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_global, self._next_chat.get(chat_id, 0.0))
+            self._next_global = slot + self.global_interval
+            self._next_chat[chat_id] = slot + self.chat_interval
+            if len(self._next_chat) > 10000:
+                self._next_chat = {
+                    key: value for key, value in self._next_chat.items() if value > now
+                }
+            return slot - now
+
+    def wait(self, chat_id):
+        delay = self.reserve(chat_id)
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Tahan semua pengiriman (dipakai saat Bot API membalas 429 retry_after)"""
+        with self._lock:
+            self._next_global = max(self._next_global, time.monotonic() + seconds)
+
+
+class TelegramDeliveryWorker:
+    """
+    Mengirim isi TelegramOutbox ke Bot API.
+
+    Setiap putaran mengklaim satu batch pesan yang jatuh tempo (status
+    `sending` dengan lease, sehingga beberapa worker tidak mengirim pesan
+    yang sama dan pesan dari worker yang mati diklaim ulang), mengirimnya
+    lewat thread pool berukuran tetap, lalu menyimpan hasilnya dengan satu
+    bulk_update. Hanya thread utama yang menyentuh database.
+    """
+
+    LEASE = timedelta(minutes=5)
+    BACKOFF_BASE = 30  # detik, digandakan setiap percobaan
+    BACKOFF_MAX = 3600
+
+    def __init__(self, client, limiter, workers=4, batch_size=100, max_attempts=5):
+        self.client = client
+        self.limiter = limiter
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="telegram")
+
+    def claim(self):
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                TelegramOutbox.objects.filter(
+                    status__in=["pending", "sending"], next_attempt_at__lte=now
+                )
+                .order_by("next_attempt_at")
+                .select_for_update(skip_locked=True)
+                .values_list("id", flat=True)[: self.batch_size]
+            )
+            if not ids:
+                return []
+            TelegramOutbox.objects.filter(id__in=ids).update(
+                status="sending", next_attempt_at=now + self.LEASE
+            )
+        return list(
+            TelegramOutbox.objects.filter(id__in=ids).only("id", "chat_id", "text", "attempts")
+        )
+
+    def _send(self, message):
+        self.limiter.wait(message.chat_id)
+        try:
+            self.client.send_message(message.chat_id, message.text)
+        except TelegramError as exc:
+            if exc.retry_after:
+                self.limiter.pause(exc.retry_after)
+            return exc
+        return None
+
+    def _backoff(self, attempts, retry_after=None):
+        if retry_after:
+            return timedelta(seconds=retry_after)
+        delay = min(self.BACKOFF_BASE * 2 ** (attempts - 1), self.BACKOFF_MAX)
+        return timedelta(seconds=delay * random.uniform(0.5, 1.5))
+
+    def run_once(self):
+        """Kirim satu batch. Return dict jumlah pesan per hasil."""
+        messages = self.claim()
+        results = {"sent": 0, "retry": 0, "failed": 0}
+        if not messages:
+            return results
+
+        errors = list(self._executor.map(self._send, messages))
+        now = timezone.now()
+        for message, error in zip(messages, errors):
+            message.attempts += 1
+            if error is None:
+                message.status = "sent"
+                message.sent_at = now
+                message.last_error = ""
+                results["sent"] += 1
+            elif error.permanent or message.attempts >= self.max_attempts:
+                message.status = "failed"
+                message.last_error = str(error)
+                results["failed"] += 1
+                logger.warning("Telegram message %s failed: %s", message.pk, error)
+            else:
+                message.status = "pending"
+                message.next_attempt_at = now + self._backoff(message.attempts, error.retry_after)
+                message.last_error = str(error)
+                results["retry"] += 1
+
+        TelegramOutbox.objects.bulk_update(
+            messages, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.client.close()
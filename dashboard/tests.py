@@ -1,3 +1,638 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import re
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .middleware import QueryBudgetExceeded, QueryBudgetMiddleware
+from .models import (
+    ActivityReport,
+    AnalysisReport,
+    ComplianceSnapshot,
+    Notification,
+    NotificationArchive,
+    NotificationCounter,
+    ReportDailyStats,
+    ShiftSchedule,
+    TelegramOutbox,
+    User,
+)
+from .pagination import InvalidCursor, KeysetPaginator
+from .services.compliance_service import ReportComplianceService
+from .services.image_store import get_image_store
+from .services.telegram_delivery import RateLimiter, TelegramClient, TelegramDeliveryWorker
+
+
+class AnalysisReportBlobDeferTests(TestCase):
+    """Listing tidak boleh menarik blob gambar (dokumentasi_*_data) dari database"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.leader = User.objects.create_user(
+            username="leader", email="leader@example.com", password="pw", role="leader", name="Leader"
+        )
+        cls.foreman = User.objects.create_user(
+            username="foreman", email="foreman@example.com", password="pw",
+            role="foreman", name="Foreman", leader=cls.leader,
+        )
+        cls.superuser = User.objects.create_superuser(
+            username="root", password="pw", email="root@example.com", role="superadmin"
+        )
+        cls.blob = b"\xff\xd8" + b"x" * 4096
+        for offset in range(3):
+            AnalysisReport.objects.create(
+                foreman=cls.foreman,
+                report_date=today - datetime.timedelta(days=offset),
+                WO_date=today,
+                Trouble_date=today,
+                problem="1000",
+                title_problem=f"Problem {offset}",
+                dokumentasi_sebelum_data=cls.blob,
+                dokumentasi_sesudah_data=cls.blob,
+            )
+
+    def assertNoBlobColumns(self, user, url):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Kolom blob boleh muncul di predikat (mis. IS NOT NULL), tapi tidak di daftar SELECT
+        for query in ctx.captured_queries:
+            for column in AnalysisReport.IMAGE_BLOB_FIELDS:
+                self.assertIsNone(
+                    re.search(rf'"{column}"(,| FROM)', query["sql"]),
+                    f"{url} loads {column}: {query['sql']}",
+                )
+
+    def test_foreman_dashboard(self):
+        self.assertNoBlobColumns(self.foreman, reverse("foreman_dashboard"))
+
+    def test_foreman_report_status(self):
+        self.assertNoBlobColumns(self.foreman, reverse("foreman_report_status"))
+
+    def test_leader_dashboard(self):
+        self.assertNoBlobColumns(self.leader, reverse("leader_dashboard"))
+
+    def test_admin_changelist(self):
+        self.assertNoBlobColumns(
+            self.superuser, reverse("admin:dashboard_analysisreport_changelist")
+        )
+
+    def test_with_images_loads_blobs(self):
+        report = AnalysisReport.objects.with_images().first()
+        with self.assertNumQueries(0):
+            self.assertEqual(bytes(report.dokumentasi_sebelum_data), self.blob)
+            self.assertEqual(bytes(report.dokumentasi_sesudah_data), self.blob)
+
+        report = AnalysisReport.objects.with_images("sesudah").first()
+        self.assertEqual(report.get_deferred_fields(), {"dokumentasi_sebelum_data"})
+
+
+@override_settings(TELEGRAM_DELIVERY_ENABLED=True)
+class NotificationBulkBroadcastTests(TestCase):
+    """bulk_broadcast dengan idempotency key hanya memproses baris yang benar-benar dibuat"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f"user{i}", email=f"user{i}@example.com", password="pw",
+                role="foreman", name=f"User {i}", telegram_chat_id=str(1000 + i),
+            )
+            for i in range(3)
+        ]
+
+    def broadcast(self, recipients):
+        return Notification.bulk_broadcast(
+            "Reminder", "Isi laporan", recipients, kind="reminder", key_date=timezone.localdate()
+        )
+
+    def test_outbox_and_counter_use_inserted_rows(self):
+        self.assertEqual(self.broadcast(self.users[:2]), 2)
+        self.assertEqual(self.broadcast(self.users), 1)
+        self.assertEqual(self.broadcast(self.users), 0)
+
+        self.assertEqual(Notification.objects.count(), 3)
+        self.assertEqual(TelegramOutbox.objects.count(), 3)
+        self.assertFalse(TelegramOutbox.objects.filter(notification__isnull=True).exists())
+        for user in self.users:
+            self.assertEqual(NotificationCounter.unread_for(user), 1)
+
+    def test_repeat_broadcast_is_one_select(self):
+        self.broadcast(self.users)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.broadcast(self.users), 0)
+
+
+class NotificationMarkAsReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="reader", email="reader@example.com", password="pw", role="foreman", name="Reader"
+        )
+
+    def test_stale_instance_does_not_decrement_twice(self):
+        notification = Notification.objects.create(recipient=self.user, title="T", message="M")
+        stale = Notification.objects.get(pk=notification.pk)
+        self.assertEqual(NotificationCounter.unread_for(self.user), 1)
+
+        notification.mark_as_read()
+        stale.mark_as_read()
+
+        self.assertEqual(NotificationCounter.unread_for(self.user), 0)
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 0)
+        self.assertEqual(stale.status, "read")
+        self.assertIsNotNone(stale.read_at)
+
+    def test_save_and_delete_after_mark_as_read(self):
+        notification = Notification.objects.create(recipient=self.user, title="T", message="M")
+        notification.mark_as_read()
+
+        notification.title = "T2"
+        notification.save()
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 0)
+
+        notification.delete()
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 0)
+
+
+class NotificationETagTests(TestCase):
+    """Versi ETag notifikasi disimpan di database, bukan di cache per proses"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="poller", email="poller@example.com", password="pw", role="foreman", name="Poller"
+        )
+
+    def test_not_modified_until_notification_changes(self):
+        self.client.force_login(self.user)
+        url = reverse("get_notifications")
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        notification = Notification.objects.create(recipient=self.user, title="T", message="M")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        notification.mark_as_read()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_since_id_returns_oldest_new_notifications_first(self):
+        self.client.force_login(self.user)
+        url = reverse("get_notifications")
+        first = Notification.objects.create(recipient=self.user, title="T0", message="M")
+        created = [
+            Notification.objects.create(recipient=self.user, title=f"T{i}", message="M")
+            for i in range(1, 13)
+        ]
+
+        data = self.client.get(url, {"since_id": first.pk}).json()
+        self.assertEqual([n["id"] for n in data["notifications"]], [n.pk for n in created[:10]])
+        self.assertEqual(data["latest_id"], created[9].pk)
+        self.assertTrue(data["has_more"])
+
+        data = self.client.get(url, {"since_id": data["latest_id"]}).json()
+        self.assertEqual([n["id"] for n in data["notifications"]], [n.pk for n in created[10:]])
+        self.assertFalse(data["has_more"])
+
+        data = self.client.get(url, {"since_id": data["latest_id"]}).json()
+        self.assertEqual(data["notifications"], [])
+        self.assertEqual(data["latest_id"], created[-1].pk)
+
+
+class TelegramStubHandler(BaseHTTPRequestHandler):
+    """Bot API palsu: balasan ditentukan oleh chat_id"""
+
+    RESPONSES = {
+        "ok": (200, {"ok": True, "result": {}}),
+        "down": (502, {"ok": False, "description": "Bad Gateway"}),
+        "blocked": (403, {"ok": False, "description": "Forbidden: bot was blocked by the user"}),
+    }
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status, body = self.RESPONSES[payload["chat_id"]]
+        body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TelegramDeliveryWorkerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), TelegramStubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        host, port = self.server.server_address
+        self.worker = TelegramDeliveryWorker(
+            TelegramClient("TOKEN", f"http://{host}:{port}"),
+            RateLimiter(1000, 1000),
+            workers=2,
+            max_attempts=5,
+        )
+        self.addCleanup(self.worker.close)
+
+    def test_delivery_results(self):
+        sent, retried, failed = (
+            TelegramOutbox.objects.create(chat_id=chat_id, text="Halo")
+            for chat_id in ("ok", "down", "blocked")
+        )
+        before = timezone.now()
+
+        self.assertEqual(self.worker.run_once(), {"sent": 1, "retry": 1, "failed": 1})
+
+        sent.refresh_from_db()
+        self.assertEqual(sent.status, "sent")
+        self.assertIsNotNone(sent.sent_at)
+
+        # 5xx: dicoba lagi setelah backoff
+        retried.refresh_from_db()
+        self.assertEqual(retried.status, "pending")
+        self.assertEqual(retried.attempts, 1)
+        self.assertGreaterEqual(
+            retried.next_attempt_at,
+            before + datetime.timedelta(seconds=TelegramDeliveryWorker.BACKOFF_BASE * 0.5),
+        )
+        self.assertIn("Bad Gateway", retried.last_error)
+
+        # 4xx: gagal permanen tanpa percobaan ulang
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, "failed")
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("blocked", failed.last_error)
+
+        # Pesan yang di-backoff belum jatuh tempo
+        self.assertEqual(self.worker.run_once(), {"sent": 0, "retry": 0, "failed": 0})
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="budget", email="budget@example.com", password="pw", role="foreman", name="Budget"
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_headers(self):
+        response = self.client.get(reverse("get_notifications"))
+        self.assertGreater(int(response["X-Query-Count"]), 0)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_first_poll_within_budget(self):
+        # User belum punya baris NotificationCounter: baris dibuat sekali untuk ETag & unread_count
+        self.assertFalse(NotificationCounter.objects.filter(user=self.user).exists())
+        response = self.client.get(reverse("get_notifications"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse("get_notifications")).status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={"get_notifications": 1}, QUERY_BUDGET_STRICT=True)
+    def test_strict_budget_exceeded(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "get_notifications"):
+            self.client.get(reverse("get_notifications"))
+
+    async def test_async_get_response(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = QueryBudgetMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        self.assertEqual(response["X-Query-Count"], "0")
+
+
+class LeaderDashboardPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.leader = User.objects.create_user(
+            username="pager", email="pager@example.com", password="pw", role="leader", name="Pager"
+        )
+        foreman = User.objects.create_user(
+            username="paged", email="paged@example.com", password="pw",
+            role="foreman", name="Paged", leader=cls.leader,
+        )
+        for offset in range(12):
+            AnalysisReport.objects.create(
+                foreman=foreman,
+                report_date=today - datetime.timedelta(days=offset),
+                WO_date=today,
+                Trouble_date=today,
+                problem="1000",
+                title_problem=f"Problem {offset}",
+            )
+
+    def test_page_links_keep_other_parameters(self):
+        self.client.force_login(self.leader)
+        response = self.client.get(reverse("leader_dashboard"), {"validated_page": "3", "pending_page": "1"})
+        self.assertContains(response, "?validated_page=3&pending_page=2#pending-reports")
+
+
+class PruneImageStoreTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(IMAGE_STORE_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.store = get_image_store()
+
+    def test_deletes_only_unreferenced_images(self):
+        today = timezone.localdate()
+        foreman = User.objects.create_user(
+            username="pruner", email="pruner@example.com", password="pw", role="foreman", name="Pruner"
+        )
+        used = self.store.save(b"used image", {"thumb": b"used thumb"})
+        orphan = self.store.save(b"orphan image", {"thumb": b"orphan thumb"})
+        AnalysisReport.objects.create(
+            foreman=foreman, report_date=today, WO_date=today, Trouble_date=today,
+            problem="1000", title_problem="Problem", dokumentasi_sebelum_sha256=used.sha256,
+        )
+
+        call_command("prune_image_store", "--min-age", "0", "--dry-run", stdout=io.StringIO())
+        self.assertTrue(self.store.exists(orphan.sha256))
+
+        call_command("prune_image_store", "--min-age", "0", stdout=io.StringIO())
+        self.assertTrue(self.store.exists(used.sha256))
+        self.assertTrue(self.store.exists(used.sha256, "thumb"))
+        self.assertFalse(self.store.exists(orphan.sha256))
+        self.assertFalse(self.store.exists(orphan.sha256, "thumb"))
+
+        # Gambar yang baru ditulis dilewati selama masa tenggang
+        fresh = self.store.save(b"fresh image")
+        call_command("prune_image_store", stdout=io.StringIO())
+        self.assertTrue(self.store.exists(fresh.sha256))
+
+
+class ReportDailyStatsTests(TestCase):
+    """Rollup harus sama dengan COUNT(*) tabel laporan; feed leader tidak bergantung padanya"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.leader = User.objects.create_user(
+            username="rollup-leader", email="rollup-leader@example.com", password="pw",
+            role="leader", name="Rollup Leader",
+        )
+        cls.foreman = User.objects.create_user(
+            username="rollup-foreman", email="rollup-foreman@example.com", password="pw",
+            role="foreman", name="Rollup Foreman", leader=cls.leader,
+        )
+
+    def create_reports(self, count=3):
+        today = timezone.localdate()
+        activity = [
+            ActivityReport.objects.create(
+                foreman=self.foreman, nrp="1", section="TRACK",
+                date=today - datetime.timedelta(days=offset),
+            )
+            for offset in range(count)
+        ]
+        analysis = [
+            AnalysisReport.objects.create(
+                foreman=self.foreman, report_date=today - datetime.timedelta(days=offset),
+                WO_date=today, Trouble_date=today, problem="1000", title_problem=f"Problem {offset}",
+            )
+            for offset in range(count)
+        ]
+        return activity, analysis
+
+    def assertRollupMatchesCount(self):
+        for report_type, model, date_field in (
+            ("activity", ActivityReport, "date"),
+            ("analysis", AnalysisReport, "report_date"),
+        ):
+            actual = {
+                (row["foreman_id"], row[date_field], row["status"]): row["total"]
+                for row in model.objects.order_by()
+                .values("foreman_id", date_field, "status")
+                .annotate(total=Count("id"))
+            }
+            rollup = {
+                (row.foreman_id, row.date, row.status): row.count
+                for row in ReportDailyStats.objects.filter(report_type=report_type, count__gt=0)
+            }
+            self.assertEqual(rollup, actual, report_type)
+
+    def test_rollup_tracks_create_status_change_and_delete(self):
+        activity, analysis = self.create_reports()
+        self.assertRollupMatchesCount()
+
+        activity[0].status = "approved"
+        activity[0].save()
+        analysis[1].status = "rejected"
+        analysis[1].save()
+        self.assertRollupMatchesCount()
+
+        activity[1].delete()
+        analysis[0].delete()
+        self.assertRollupMatchesCount()
+
+    def test_leader_feed_ignores_rollup(self):
+        self.create_reports(6)
+        ReportDailyStats.objects.all().delete()
+
+        self.client.force_login(self.leader)
+        response = self.client.get(reverse("leader_dashboard"))
+        self.assertEqual(len(response.context["pending_reports"]), 10)
+        self.assertTrue(response.context["pending_reports"].has_next())
+        self.assertEqual(len(response.context["today_reports"]), 2)
+
+        response = self.client.get(reverse("leader_dashboard"), {"pending_page": "2"})
+        self.assertEqual(len(response.context["pending_reports"]), 2)
+        self.assertFalse(response.context["pending_reports"].has_next())
+
+
+class NotificationArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="archiver", email="archiver@example.com", password="pw", role="foreman", name="Archiver"
+        )
+
+    def test_archive_uses_status_at_delete_time(self):
+        notifications = [
+            Notification.objects.create(recipient=self.user, title=f"T{i}", message="M") for i in range(3)
+        ]
+        message = TelegramOutbox.objects.create(notification=notifications[0], chat_id="1", text="T0")
+        batch = Notification.objects.filter(pk__in=[n.pk for n in notifications[:2]])
+        # Dibaca setelah batch dipilih, sebelum batch diarsip
+        notifications[0].mark_as_read()
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 2)
+
+        self.assertEqual(NotificationArchive.archive_batch(batch), 2)
+
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 1)
+        self.assertEqual(
+            dict(NotificationArchive.objects.values_list("id", "status")),
+            {notifications[0].pk: "read", notifications[1].pk: "unread"},
+        )
+        message.refresh_from_db()
+        self.assertIsNone(message.notification_id)
+
+        # Signal counter tetap aktif setelah arsip
+        notifications[2].delete()
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread, 0)
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="keyset", email="keyset@example.com", password="pw", role="foreman", name="Keyset"
+        )
+        Notification.objects.bulk_create([
+            Notification(recipient=cls.user, title=f"T{i}", message="M") for i in range(25)
+        ])
+        # Dua kelompok created_at yang sama persis: urutan ditentukan id sebagai tie-breaker
+        now = timezone.now()
+        ids = list(Notification.objects.order_by("id").values_list("id", flat=True))
+        Notification.objects.filter(id__in=ids[:15]).update(created_at=now - datetime.timedelta(days=1))
+        Notification.objects.filter(id__in=ids[15:]).update(created_at=now)
+        cls.expected = list(
+            Notification.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def paginator(self):
+        return KeysetPaginator(
+            Notification.objects.filter(recipient=self.user), 10, ordering=("-created_at", "-id")
+        )
+
+    def ids(self, page):
+        return [notification.id for notification in page]
+
+    def test_cursor_round_trip(self):
+        paginator = self.paginator()
+        first = paginator.page(None)
+        self.assertFalse(first.has_previous())
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertFalse(third.has_next())
+        self.assertTrue(third.has_previous())
+        self.assertEqual(self.ids(first) + self.ids(second) + self.ids(third), self.expected)
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertTrue(back.has_next())
+        self.assertTrue(back.has_previous())
+        self.assertEqual(self.ids(paginator.page(back.previous_cursor)), self.ids(first))
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        paginator = self.paginator()
+        for cursor in ("not-a-cursor", "eyJkIjoibiIsInYiOlsxXX0", "e30"):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+            self.assertEqual(self.ids(paginator.get_page(cursor)), self.expected[:10])
+
+    def test_mixed_directions_rejected(self):
+        with self.assertRaises(ValueError):
+            KeysetPaginator(Notification.objects.all(), 10, ordering=("-created_at", "id"))
+
+    def test_notification_list_links(self):
+        self.client.force_login(self.user)
+        url = reverse("notification_list")
+        response = self.client.get(url)
+        page = response.context["notifications"]
+        self.assertFalse(page.has_previous())
+        self.assertContains(response, f'href="?cursor={page.next_cursor}"')
+
+        response = self.client.get(url, {"cursor": page.next_cursor})
+        page = response.context["notifications"]
+        self.assertEqual(self.ids(page), self.expected[10:20])
+        self.assertContains(response, f'href="?cursor={page.previous_cursor}"')
+        self.assertContains(response, f'href="?cursor={page.next_cursor}"')
+
+
+class ReportComplianceServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        cls.leader = User.objects.create_user(
+            username="compliance-leader", email="compliance-leader@example.com", password="pw",
+            role="leader", name="Compliance Leader",
+        )
+
+        def foreman(name, shift=1, **extra):
+            return User.objects.create_user(
+                username=name, email=f"{name}@example.com", password="pw", role="foreman",
+                name=name.title(), leader=cls.leader, shift=shift, **extra,
+            )
+
+        cls.reported = foreman("reported")
+        cls.missing = foreman("missing")
+        cls.stopped = foreman("stopped")
+        cls.moved = foreman("moved", shift=2)
+        cls.inactive = foreman("inactive", is_active=False)
+        ActivityReport.objects.create(foreman=cls.reported, nrp="1", section="TRACK", date=cls.today)
+        for user, shift in ((cls.stopped, 0), (cls.moved, 1)):
+            ShiftSchedule.objects.create(foreman=user, date=cls.today, shift=shift, department="TRACK")
+
+    def test_missing_and_submitted_foremen(self):
+        service = ReportComplianceService(self.today)
+        self.assertEqual(
+            set(service.missing_foremen()), {self.missing, self.stopped, self.moved}
+        )
+        self.assertEqual(list(service.submitted_foremen()), [self.reported])
+        self.assertEqual(list(service.missing_foremen(shift=2)), [self.moved])
+
+    def test_scheduled_foremen(self):
+        service = ReportComplianceService(self.today)
+        # Jadwal "Stop" tidak dihitung; tanpa jadwal memakai User.shift; jadwal menimpa User.shift
+        self.assertEqual(
+            set(service.scheduled_foremen(1)), {self.reported, self.missing, self.moved}
+        )
+        self.assertEqual(list(service.scheduled_foremen(2)), [])
+
+        compliance = service.shift_compliance(1)
+        self.assertEqual(compliance["expected"], 3)
+        self.assertEqual(compliance["submitted"], 1)
+        self.assertEqual(compliance["missing_ids"], [self.missing.pk, self.moved.pk])
+
+    def test_final_snapshot_not_overwritten(self):
+        service = ReportComplianceService(self.today)
+        final = service.snapshot(1, final=True)
+        self.assertTrue(final.is_final)
+
+        ActivityReport.objects.create(foreman=self.missing, nrp="1", section="TRACK", date=self.today)
+        self.assertTrue(service.snapshot(1).is_final)
+        snapshots = service.snapshots(max_age=datetime.timedelta(0))
+
+        stored = ComplianceSnapshot.objects.get(date=self.today, shift=1)
+        self.assertTrue(stored.is_final)
+        self.assertEqual(stored.submitted, 1)
+        self.assertEqual(snapshots[0].submitted, 1)
+        # Shift tanpa snapshot dibuat sebagai snapshot sementara
+        self.assertFalse(snapshots[1].is_final)
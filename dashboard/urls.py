@@ -9,6 +9,7 @@ urlpatterns = [
     # path("register/", views.register_view, name="register"),
     # Admin URLs for Employee Management
     path("superadmin/", views.admin_dashboard, name="admin_dashboard"), # Admin dashboad Oke
+    path("superadmin/tabs/<slug:tab>/", views.admin_dashboard_tab, name="admin_dashboard_tab"),
     path("superadmin/<int:user_id>/", views.admin_detail, name="admin_detail"), #admin detil sudah oke
     path("superadmin/<int:user_id>/edit/", views.admin_edit, name="admin_edit"), # Admin edit sudah oke
     path(
@@ -77,11 +78,15 @@ urlpatterns = [
     
     # Notification URLs
     path('superadmin/notifications/', views.notification_center, name='notification_center'),
+    path('superadmin/compliance/', views.compliance_history, name='compliance_history'),
     path('superadmin/notifications/broadcast/', views.broadcast_notification, name='broadcast_notification'),
-    path('<str:username>/notifications/', views.user_notifications, name='user_notifications'),
     path('notifications/', views.notification_list, name='notification_list'),
     path('notifications/<int:notification_id>/read/', views.mark_notification_read_and_redirect, name='mark_notification_read_and_redirect'),
     path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
     path('api/notifications/', views.get_notifications, name='get_notifications'),
+    path('api/notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('api/notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
     path('api/notifications/<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
+    # Harus paling akhir: pola <username>/notifications/ juga cocok dengan "api/notifications/"
+    path('<str:username>/notifications/', views.user_notifications, name='user_notifications'),
 ]
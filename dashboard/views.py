@@ -1,11 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.conf import settings
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.utils import timezone
-from datetime import timedelta
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import urlencode
 from .forms import (
     LoginForm,
     # RegisterForm,
@@ -18,18 +20,30 @@ from .forms import (
     # RoleBasedUserCreationForm,
     LeaderQuotaForm,
 )
-from .models import User, ActivityReport, AnalysisReport, LeaderQuota, Notification, ActivityReportDetail
+from .models import User, ActivityReport, AnalysisReport, LeaderQuota, Notification, NotificationCounter, ActivityReportDetail, ComplianceSnapshot
 import csv
 from .services.pdf_service import PDFReportService
 from .services.analysis_pdf_service import AnalysisPDFService
-from django.db.models import Q, Count
+from .services.report_feed_service import ReportFeedService
+from .services.stats_service import ReportStatsService
+from .services.compliance_service import ReportComplianceService
+from .services.image_store import RENDITIONS
+from .services.notification_stream import notification_broker
+from .pagination import KeysetPaginator
+from django.db.models import Q, Count, OuterRef, Subquery
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
+from asgiref.sync import sync_to_async
+import asyncio
 import json
 import datetime
+import logging
+import os
 import zipfile
 from io import BytesIO
 
+logger = logging.getLogger(__name__)
+
 
 def hello_world_tailwind(request):
     """View untuk demo Tailwind CSS"""
@@ -128,83 +142,52 @@ def logout_view(request):
 # LEADER VIEW   --=-==-=--=-==------==-=-=-=-=--=---=-=-=-=-=-=-=-=-=-=-
 
 
+def _query_without(request, param):
+    """Query string request saat ini tanpa `param`, dipakai ulang oleh link pagination"""
+    query = request.GET.copy()
+    query.pop(param, None)
+    return query.urlencode()
+
+
 @login_required
 @role_required(["leader"])
 def leader_dashboard(request):
     # Mendapatkan foreman yang berada di bawah leader ini
     my_foremen = User.objects.filter(role="foreman", leader=request.user)
-    total_employees = my_foremen.count()
 
-    # Mendapatkan activity reports dan analysis reports dari foreman bawahan
+    # Feed gabungan activity + analysis report (UNION di database)
     today = timezone.now().date()
-    my_foremen_activity_reports = ActivityReport.objects.filter(foreman__in=my_foremen)
-    my_foremen_analysis_reports = AnalysisReport.objects.filter(foreman__in=my_foremen)
-
-    # Gabungkan kedua jenis laporan dengan menambahkan field 'report_type'
-    combined_reports = []
-
-    # Tambahkan activity reports
-    for report in my_foremen_activity_reports:
-        combined_reports.append(
-            {
-                "id": report.id,
-                "date": report.date,
-                "foreman": report.foreman,
-                "unit_code": report.activities.first().unit_code if report.activities.exists() else "-",
-                "component": report.activities.first().component if report.activities.exists() else "-",
-                "activities": report.activities.first().activity_code if report.activities.exists() else "-",
-                "status": report.status,
-                "report_type": "activity",
-                "report_type_display": "Activity Report",
-                "validation_url": "leader_validation_activity",
-                "created_at": report.created_at or report.date,
-            }
-        )
-
-    # Tambahkan analysis reports
-    for report in my_foremen_analysis_reports:
-        combined_reports.append(
-            {
-                "id": report.id,
-                "date": report.report_date,
-                "foreman": report.foreman,
-                "unit_code": report.unit_code,
-                "component": report.get_problem_display() if report.problem else "-",
-                "activities": report.title_problem[:50] + "..."
-                if len(report.title_problem) > 50
-                else report.title_problem,
-                "status": report.status,
-                "report_type": "analysis",
-                "report_type_display": "Analysis Report",
-                "validation_url": "leader_validation_analysis",
-                "created_at": report.created_at or report.report_date,
-            }
-        )
-
-    # Sort berdasarkan tanggal terbaru
-    combined_reports.sort(key=lambda x: x["created_at"], reverse=True)
-
-    # Filter berdasarkan status dan tanggal
-    pending_reports = [r for r in combined_reports if r["status"] == "pending"]
-    today_reports = [r for r in combined_reports if r["date"] == today]
-    validated_reports = [
-        r for r in combined_reports if r["status"] in ["approved", "rejected"]
-    ]
-
-    # Statistik
-    today_reports_count = len(today_reports)
-    pending_validation_count = len(pending_reports)
-    completed_reports_count = len(validated_reports)
+    feed_service = ReportFeedService(request.user)
+
+    # Counter kartu statistik dari rollup ReportDailyStats dalam satu query
+    stats_service = ReportStatsService.for_request(request)
+    team_stats = stats_service.team_stats
+    pending_count = team_stats["pending"]
+    today_count = team_stats["today"]
+    validated_count = team_stats["validated"]
+
+    # Setiap tab punya pagination sendiri
+    pending_reports = feed_service.paginate(
+        feed_service.get_feed(statuses=["pending"]),
+        request.GET.get("pending_page"),
+    )
+    today_reports = feed_service.paginate(
+        feed_service.get_feed(on_date=today),
+        request.GET.get("today_page"),
+    )
+    validated_reports = feed_service.paginate(
+        feed_service.get_feed(statuses=["approved", "rejected"]),
+        request.GET.get("validated_page"),
+    )
 
     # Recent reports (5 terbaru)
-    recent_reports = combined_reports[:5]
-
+    recent_reports = feed_service.recent(5)
 
     stats = {
-        "total_employees": total_employees,
-        "today_reports": today_reports_count,
-        "pending_validation": pending_validation_count,
-        "completed_reports": completed_reports_count,
+        "total_employees": stats_service.user_counts["team_foremen"],
+        "today_reports": today_count,
+        "pending_validation": pending_count,
+        "completed_reports": validated_count,
     }
 
     context = {
@@ -215,6 +198,10 @@ def leader_dashboard(request):
         "pending_reports": pending_reports,  # Untuk tab pending-reports
         "today_reports": today_reports,  # Untuk tab today-reports
         "validated_reports": validated_reports,  # Untuk tab validated-reports
+        # Pagination satu tab mempertahankan halaman tab lain & parameter lainnya
+        "pending_query": _query_without(request, "pending_page"),
+        "today_query": _query_without(request, "today_page"),
+        "validated_query": _query_without(request, "validated_page"),
     }
 
     return render(request, "leader/leader_dashboard.html", context)
@@ -269,7 +256,7 @@ def leader_validation_analysis(request):
         return redirect("leader_dashboard")
 
     try:
-        report = AnalysisReport.objects.get(id=report_id, foreman__leader=request.user)
+        report = AnalysisReport.objects.with_image_flags().get(id=report_id, foreman__leader=request.user)
     except AnalysisReport.DoesNotExist:
         messages.error(
             request, "Laporan tidak ditemukan atau Anda tidak memiliki akses."
@@ -293,7 +280,18 @@ def leader_validation_analysis(request):
             messages.success(request, "Laporan analisis berhasil ditolak.")
             return redirect("leader_dashboard")
 
-    context = {"report": report}
+    # Dokumentasi ditampilkan dalam rendition medium, tautan ke gambar ukuran penuh
+    documentation = [
+        {
+            "label": f"Dokumentasi {field_type.capitalize()}",
+            "url": report.image_url(field_type, size="medium"),
+            "full_url": report.image_url(field_type),
+        }
+        for field_type in AnalysisReport.IMAGE_FIELD_TYPES
+        if report.has_image(field_type)
+    ]
+
+    context = {"report": report, "documentation": documentation}
 
     return render(request, "leader/leader_validation_analysis_new.html", context)
 
@@ -323,41 +321,26 @@ def leader_validation_analysis(request):
 @login_required
 @role_required(["admin", "superadmin"])
 def admin_dashboard(request):
-    # Statistik untuk admin
-    total_users = User.objects.count()
-    total_leaders = User.objects.filter(role="leader").count()
-    total_foremen = User.objects.filter(role="foreman").count()
-    pending_reports = ActivityReport.objects.filter(status="pending").count()
-    validated_reports = ActivityReport.objects.filter(
-        status__in=["approved", "rejected"]
-    ).count()
-
-    # Data untuk tabs
-    pending_activity_reports = ActivityReport.objects.filter(status="pending").order_by(
-        "-date"
-    )
-    validated_activity_reports = ActivityReport.objects.filter(
-        status__in=["approved", "rejected"]
-    ).order_by("-date")
-    all_users = User.objects.select_related('leader').all().order_by("-date_joined")
-    leader_quotas = LeaderQuota.objects.all().order_by("leader_name")
-    foremen = User.objects.filter(role="foreman", is_active=True)
+    # Statistik untuk admin (satu query user + satu query rollup).
+    # Isi tab dimuat terpisah lewat admin_dashboard_tab saat tab dibuka.
+    stats_service = ReportStatsService.for_request(request)
+    user_counts = stats_service.user_counts
+    global_stats = stats_service.global_stats
+
+    # Pilihan mekanik untuk modal export PDF
+    foremen = User.objects.filter(role="foreman", is_active=True).only("id", "name", "username")
 
 
     stats = {
-        "total_users": total_users,
-        "total_leaders": total_leaders,
-        "total_foremen": total_foremen,
-        "pending_reports": pending_reports,
-        "validated_reports": validated_reports,
+        "total_users": user_counts["total_users"],
+        "total_leaders": user_counts["total_leaders"],
+        "total_foremen": user_counts["total_foremen"],
+        "pending_reports": global_stats["pending"],
+        "validated_reports": global_stats["validated"],
     }
 
     context = {
         "stats": stats,
-        "pending_activity_reports": pending_activity_reports,
-        "validated_activity_reports": validated_activity_reports,
-        "all_users": all_users,
-        "leader_quotas": leader_quotas,
         "foremen": foremen,
         # Remove "user": request.user to avoid conflicts
     }
@@ -365,6 +348,109 @@ def admin_dashboard(request):
     return render(request, "admin/admin_dashboard.html", context)
 
 
+# Konfigurasi tab dashboard admin: template fragment, pilihan sort (ordering keyset),
+# filter dropdown dan field yang dicari oleh ?q=
+REPORT_SORTS = [
+    ("newest", "Terbaru", ("-date", "-id")),
+    ("oldest", "Terlama", ("date", "id")),
+]
+ADMIN_DASHBOARD_TABS = {
+    "pending-reports": {
+        "template": "admin/tabs/pending_reports.html",
+        "sorts": REPORT_SORTS,
+        "search": ["foreman__name", "foreman__username", "nrp"],
+    },
+    "validated-reports": {
+        "template": "admin/tabs/validated_reports.html",
+        "sorts": REPORT_SORTS,
+        "search": ["foreman__name", "foreman__username", "nrp"],
+        "filter": ("status", [("approved", "Disetujui"), ("rejected", "Ditolak")]),
+    },
+    "user-management": {
+        "template": "admin/tabs/user_management.html",
+        "sorts": [
+            ("newest", "Terbaru", ("-date_joined", "-id")),
+            ("oldest", "Terlama", ("date_joined", "id")),
+            ("username", "Username", ("username",)),
+        ],
+        "search": ["name", "username", "email"],
+        "filter": ("role", User.ROLE_CHOICES),
+    },
+    "leader-quota": {
+        "template": "admin/tabs/leader_quota.html",
+        "sorts": [
+            ("name", "Nama Leader", ("leader_name", "id")),
+            ("newest", "Terbaru", ("-created_at", "-id")),
+        ],
+        "search": ["leader_name", "leader_username"],
+        "filter": ("active", [("1", "Aktif"), ("0", "Nonaktif")]),
+    },
+}
+
+
+def _admin_tab_queryset(tab, filter_value):
+    if tab == "pending-reports":
+        return ActivityReport.objects.select_related("foreman__leader").filter(status="pending")
+    if tab == "validated-reports":
+        statuses = [filter_value] if filter_value else ["approved", "rejected"]
+        return ActivityReport.objects.select_related("foreman__leader").filter(status__in=statuses)
+    if tab == "user-management":
+        users = User.objects.select_related("leader")
+        return users.filter(role=filter_value) if filter_value else users
+    quotas = LeaderQuota.objects.select_related("leader_user")
+    return quotas.filter(is_active=filter_value == "1") if filter_value else quotas
+
+
+@login_required
+@role_required(["admin", "superadmin"])
+def admin_dashboard_tab(request, tab):
+    """Fragment HTML satu tab dashboard admin (filter, sort & cursor pagination di server)"""
+    config = ADMIN_DASHBOARD_TABS.get(tab)
+    if config is None:
+        raise Http404("Tab tidak ditemukan")
+
+    sorts = {value: ordering for value, _, ordering in config["sorts"]}
+    sort = request.GET.get("sort")
+    if sort not in sorts:
+        sort = config["sorts"][0][0]
+
+    filter_name, filter_options = config.get("filter", (None, []))
+    filter_value = request.GET.get(filter_name, "") if filter_name else ""
+    if filter_value not in {value for value, _ in filter_options}:
+        filter_value = ""
+
+    queryset = _admin_tab_queryset(tab, filter_value)
+    q = request.GET.get("q", "").strip()
+    if q:
+        search = Q()
+        for field in config["search"]:
+            search |= Q(**{f"{field}__icontains": q})
+        queryset = queryset.filter(search)
+
+    page = KeysetPaginator(queryset, 20, ordering=sorts[sort]).get_page(request.GET.get("cursor"))
+
+    # Query string filter aktif, dipakai ulang oleh link pagination
+    query = {"sort": sort}
+    if q:
+        query["q"] = q
+    if filter_value:
+        query[filter_name] = filter_value
+
+    context = {
+        "tab": tab,
+        "tab_url": reverse("admin_dashboard_tab", args=[tab]),
+        "page": page,
+        "q": q,
+        "sort": sort,
+        "sort_options": [(value, label) for value, label, _ in config["sorts"]],
+        "filter_name": filter_name,
+        "filter_options": filter_options,
+        "filter_value": filter_value,
+        "query": urlencode(query),
+    }
+    return render(request, config["template"], context)
+
+
 # Ganti decorator untuk admin_detail
 @login_required
 @role_required(["admin", "superadmin"])
@@ -445,37 +531,23 @@ def foreman_dashboard(request):
         "-date", "-created_at"
     )
 
-    # Get total reports
-    total_reports = activity_reports.count()
-
-    # Get reports from today
-    today = timezone.now().date()
-    today_reports = activity_reports.filter(date=today).count()
-
-    # Get reports from this week
-    week_ago = today - timedelta(days=7)
-    this_week_reports = activity_reports.filter(date__gte=week_ago).count()
-
-    # Get reports from this month
-    month_start = today.replace(day=1)
-    this_month_reports = activity_reports.filter(date__gte=month_start).count()
+    # Semua counter (total, hari ini, minggu, bulan, analysis bulan ini) dari
+    # rollup ReportDailyStats dalam satu query aggregate
+    stats_service = ReportStatsService.for_request(request)
+    my_stats = stats_service.foreman_stats
+    today = stats_service.today
 
     # Check if user has submitted activity report today
     activity_report_today = activity_reports.filter(date=today).first()
 
     # === ANALYSIS REPORTS ===
-    current_month = today.month
-    current_year = today.year
-
     # Get all analysis reports for current user
     analysis_reports = AnalysisReport.objects.filter(foreman=request.user).order_by(
         "-report_date"
     )
 
     # Get analysis reports for current month
-    analysis_reports_count = analysis_reports.filter(
-        report_date__year=current_year, report_date__month=current_month
-    ).count()
+    analysis_reports_count = my_stats["analysis_month_reports"]
 
     # Analysis report requirements
     analysis_reports_required = 3  # 3 laporan per bulan
@@ -496,8 +568,8 @@ def foreman_dashboard(request):
         analysis_status_text = f"{analysis_reports_remaining} laporan lagi"
 
     # === COMBINED RECENT REPORTS ===
-    # Get recent activity reports (last 3)
-    recent_activity_reports = activity_reports[:3]
+    # Get recent activity reports (last 3), detail diambil sekali lewat prefetch
+    recent_activity_reports = activity_reports.prefetch_related("activities")[:3]
 
     # Get recent analysis reports (last 2)
     recent_analysis_reports = analysis_reports[:2]
@@ -509,7 +581,8 @@ def foreman_dashboard(request):
     # Add activity reports
     for report in recent_activity_reports:
         # Get first activity detail for display
-        first_activity = report.activities.first()
+        report_activities = list(report.activities.all())
+        first_activity = report_activities[0] if report_activities else None
         
         combined_reports.append(
             {
@@ -524,7 +597,7 @@ def foreman_dashboard(request):
                     "date": report.date.strftime("%d M Y"),
                     "nrp": report.nrp or "-",
                     "section": report.section or "-",
-                    "activities_count": report.activities.count(),
+                    "activities_count": report.activities_count,
                     "status": report.status,  # Add status to report_data
                     "first_activity": {
                         "unit_code": first_activity.unit_code if first_activity else "-",
@@ -575,20 +648,14 @@ def foreman_dashboard(request):
     combined_reports.sort(key=lambda x: x["date"], reverse=True)
     recent_reports = combined_reports[:5]  # Take top 5 most recent
 
-    # Get notification count for current user
-    unread_notifications_count = Notification.objects.filter(
-        recipient=request.user,
-        status='unread'
-    ).count()
-
     context = {
         # Activity Report Data
         "activity_reports": activity_reports[:5],
         "recent_reports": recent_reports,  # Combined reports for template
-        "total_reports": total_reports,
-        "today_reports": today_reports,
-        "this_week_reports": this_week_reports,
-        "this_month_reports": this_month_reports,
+        "total_reports": my_stats["total_reports"],
+        "today_reports": my_stats["today_reports"],
+        "this_week_reports": my_stats["this_week_reports"],
+        "this_month_reports": my_stats["this_month_reports"],
         "activity_report_today": activity_report_today,
         # Analysis Report Data
         "analysis_reports_count": analysis_reports_count,
@@ -598,7 +665,7 @@ def foreman_dashboard(request):
         "analysis_progress_percentage": round(analysis_progress_percentage, 1),
         "analysis_status_text": analysis_status_text,
         # Notification Data
-        "unread_notifications_count": unread_notifications_count,
+        "unread_notifications_count": stats_service.unread_notifications,
         # General Data
         "user": request.user,
         "current_time": timezone.now(),
@@ -645,6 +712,9 @@ def create_activity_report_new(request):
                 for activity in formset.deleted_objects:
                     activity.delete()
 
+                # Sinkronkan ringkasan aktivitas (first_unit_code, activities_count, dll)
+                activity_report.refresh_activity_summary()
+
                 messages.success(
                     request,
                     f"Activity Report berhasil dibuat dengan {len(activities)} aktivitas dan menunggu validasi leader!"
@@ -784,9 +854,7 @@ def foreman_report_status(request):
 def foreman_reports(request):
     """View untuk menampilkan semua laporan foreman"""
     # Get all activity reports for current user
-    reports = ActivityReport.objects.filter(foreman=request.user).order_by(
-        "-date", "-start_time"
-    )
+    reports = ActivityReport.objects.filter(foreman=request.user)
 
     # Filter berdasarkan tanggal jika ada parameter
     date_filter = request.GET.get("date")
@@ -806,17 +874,21 @@ def foreman_reports(request):
         except ValueError:
             pass
 
-    # Pagination
-    paginator = Paginator(reports, 10)  # 10 reports per page
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Pagination keyset per (date, id), tanpa OFFSET/COUNT
+    paginator = KeysetPaginator(reports, 10, ordering=("-date", "-id"))
+    page_obj = paginator.get_page(request.GET.get("cursor"))
 
-    # Statistics
-    total_reports = reports.count()
-    today = timezone.now().date()
-    this_month_reports = reports.filter(
-        date__year=today.year, date__month=today.month
-    ).count()
+    # Statistics (tanpa filter cukup dari rollup)
+    if date_filter or month_filter:
+        total_reports = reports.count()
+        today = timezone.now().date()
+        this_month_reports = reports.filter(
+            date__year=today.year, date__month=today.month
+        ).count()
+    else:
+        my_stats = ReportStatsService.for_request(request).foreman_stats
+        total_reports = my_stats["total_reports"]
+        this_month_reports = my_stats["this_month_reports"]
 
     context = {
         "reports": page_obj,
@@ -1087,19 +1159,26 @@ def export_reports_csv(request):
         ]
     )
 
-    reports = ActivityReport.objects.all().order_by("-date")
-    for report in reports:
-        # Safely get the first activity detail associated with this report
-        first_activity = report.activities.first() if report.activities.exists() else None
+    # Unit code & komponen dari kolom ringkasan, deskripsi aktivitas pertama dari subquery
+    first_activity_text = ActivityReportDetail.objects.filter(
+        activity_report=OuterRef("pk")
+    ).order_by("activity_number").values("activities")[:1]
+    reports = (
+        ActivityReport.objects.select_related("foreman", "foreman__leader")
+        .annotate(first_activity_text=Subquery(first_activity_text))
+        .order_by("-date")
+    )
+    for report in reports.iterator(chunk_size=2000):
+        has_activity = report.activities_count > 0
 
         writer.writerow(
             [
                 report.date,
                 report.foreman.name or report.foreman.username,
                 report.foreman.leader.name if report.foreman.leader else "-",
-                first_activity.unit_code if first_activity else "-",
-                (first_activity.get_component_display() if hasattr(first_activity, "get_component_display") else first_activity.component) if first_activity else "-",
-                first_activity.activities if first_activity else "-",
+                report.first_unit_code if has_activity else "-",
+                report.get_first_component_display() if has_activity else "-",
+                report.first_activity_text if has_activity else "-",
                 report.status,
                 report.feedback or "-",
             ]
@@ -1251,7 +1330,7 @@ def export_analysis_reports_pdf(request):
         if reports.count() == 1:
             # Single report - generate single TAR PDF
             pdf_service = PDFReportService()
-            return pdf_service.generate_technical_analysis_report_pdf(reports.first())
+            return pdf_service.generate_technical_analysis_report_pdf(reports.with_images().first())
         else:
             # Multiple reports - create ZIP with individual TAR PDFs
             zip_buffer = io.BytesIO()
@@ -1259,7 +1338,8 @@ def export_analysis_reports_pdf(request):
             with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
                 pdf_service = PDFReportService()
 
-                for i, report in enumerate(reports, 1):
+                # Blob gambar ikut di-load, per potongan kecil supaya memori tetap rendah
+                for i, report in enumerate(reports.with_images().iterator(chunk_size=20), 1):
                     # Generate PDF for each report
                     pdf_response = pdf_service.generate_technical_analysis_report_pdf(
                         report
@@ -1373,46 +1453,85 @@ def notification_center(request):
     """Pusat notifikasi untuk superuser - menampilkan mekanik yang belum mengisi activity report"""
     today = timezone.now().date()
     
-    # Ambil semua foreman/mekanik yang aktif
-    all_foremen = User.objects.filter(role='foreman', is_active=True).order_by('name')
+    # Kepatuhan per shift dari ComplianceSnapshot (shift sesuai ShiftSchedule hari ini);
+    # snapshot sementara dihitung ulang bila lebih tua dari COMPLIANCE_SNAPSHOT_MAX_AGE
+    snapshots = ReportComplianceService(today).snapshots(
+        max_age=datetime.timedelta(seconds=settings.COMPLIANCE_SNAPSHOT_MAX_AGE)
+    )
+    missing_ids = [foreman_id for snapshot in snapshots for foreman_id in snapshot.missing_foremen]
+    foremen = User.objects.in_bulk(missing_ids)
     
-    # Cari mekanik yang belum mengisi activity report hari ini berdasarkan shift
     foremen_without_report = []
     
-    for foreman in all_foremen:
-        # Cek apakah sudah ada activity report hari ini untuk foreman ini
-        has_report_today = ActivityReport.objects.filter(
-            foreman=foreman,
-            date=today
-        ).exists()
-        
-        if not has_report_today:
-            # Tentukan deadline berdasarkan shift
-            deadline_time = "18:00" if foreman.shift == 1 else "05:00"
-            shift_name = "Shift 1" if foreman.shift == 1 else "Shift 2"
-            
+    for snapshot in snapshots:
+        for foreman_id in snapshot.missing_foremen:
+            if foreman_id not in foremen:
+                continue
             foremen_without_report.append({
-                'foreman': foreman,
-                'shift_name': shift_name,
-                'deadline_time': deadline_time,
+                'foreman': foremen[foreman_id],
+                'shift_name': snapshot.get_shift_display(),
+                'deadline_time': snapshot.deadline,
             })
     
     # Statistik notifikasi
-    total_notifications_sent = Notification.objects.filter(created_by=request.user).count()
-    unread_notifications_count = Notification.objects.filter(status='unread').count()
+    stats_service = ReportStatsService.for_request(request)
+    notification_stats = stats_service.notification_stats
     
     context = {
         'foremen_without_report': foremen_without_report,
-        'total_foremen': all_foremen.count(),
+        'total_foremen': sum(snapshot.expected for snapshot in snapshots),
+        'submitted_count': sum(snapshot.submitted for snapshot in snapshots),
         'foremen_missing_count': len(foremen_without_report),
+        'snapshots': snapshots,
+        'snapshot_taken_at': min(snapshot.taken_at for snapshot in snapshots),
         'today': today,
-        'total_notifications_sent': total_notifications_sent,
-        'unread_notifications_count': unread_notifications_count,
+        'total_notifications_sent': notification_stats['sent_by_me'],
+        'unread_notifications_count': notification_stats['total_unread'],
     }
     
     return render(request, 'admin/notification_center.html', context)
 
 
+# Rentang hari maksimum di halaman riwayat kepatuhan
+COMPLIANCE_HISTORY_MAX_DAYS = 366
+
+
+@login_required
+@user_passes_test(lambda u: u.role in ['admin', 'superadmin'])
+def compliance_history(request):
+    """Riwayat kepatuhan pengisian activity report per tanggal dan shift (dari ComplianceSnapshot)"""
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), COMPLIANCE_HISTORY_MAX_DAYS)
+    except ValueError:
+        days = 30
+    since = timezone.now().date() - datetime.timedelta(days=days - 1)
+    
+    rows = {}
+    for snapshot in ComplianceSnapshot.objects.filter(date__gte=since).order_by('-date', 'shift'):
+        row = rows.setdefault(snapshot.date, {'date': snapshot.date, 'shifts': {}, 'expected': 0, 'submitted': 0})
+        row['shifts'][snapshot.shift] = snapshot
+        row['expected'] += snapshot.expected
+        row['submitted'] += snapshot.submitted
+    
+    history = list(rows.values())
+    for row in history:
+        row['cells'] = [row['shifts'].get(shift) for shift, _ in ComplianceSnapshot.SHIFT_CHOICES]
+        row['rate'] = round(row['submitted'] * 100 / row['expected']) if row['expected'] else 100
+    
+    total_expected = sum(row['expected'] for row in history)
+    total_submitted = sum(row['submitted'] for row in history)
+    
+    context = {
+        'history': history,
+        'days': days,
+        'day_options': [7, 30, 90, 365],
+        'average_rate': round(total_submitted * 100 / total_expected) if total_expected else None,
+        'total_expected': total_expected,
+        'total_submitted': total_submitted,
+    }
+    return render(request, 'admin/compliance_history.html', context)
+
+
 @login_required
 @user_passes_test(lambda u: u.role in ['admin', 'superadmin'])
 @require_http_methods(["POST"])
@@ -1421,29 +1540,12 @@ def broadcast_notification(request):
     try:
         today = timezone.now().date()
         
-        # Debug: Log the request
-        print(f"DEBUG: Broadcast request from user: {request.user.username}")
-        
-        # Ambil semua foreman yang belum mengisi activity report hari ini
-        all_foremen = User.objects.filter(role='foreman', is_active=True)
-        print(f"DEBUG: Total foremen found: {all_foremen.count()}")
-        
-        foremen_without_report = []
-        
-        for foreman in all_foremen:
-            has_report_today = ActivityReport.objects.filter(
-                foreman=foreman,
-                date=today
-            ).exists()
-            
-            print(f"DEBUG: Foreman {foreman.username} has report today: {has_report_today}")
-            
-            if not has_report_today:
-                foremen_without_report.append(foreman)
-        
-        print(f"DEBUG: Foremen without report: {len(foremen_without_report)}")
+        # Ambil semua foreman yang belum mengisi activity report hari ini (satu query anti-join)
+        recipient_ids = list(
+            ReportComplianceService(today).missing_foremen().values_list('id', flat=True)
+        )
         
-        if not foremen_without_report:
+        if not recipient_ids:
             return JsonResponse({
                 'success': False,
                 'message': 'Semua mekanik sudah mengisi activity report hari ini.'
@@ -1453,105 +1555,224 @@ def broadcast_notification(request):
         title = "🔔 Pengingat Activity Report"
         message = f"Harap segera mengisi activity report untuk tanggal {today.strftime('%d %B %Y')}. Jangan lupa untuk melengkapi laporan sesuai dengan shift Anda."
         
-        print(f"DEBUG: Creating notifications with title: {title}")
-        
-        # Broadcast notifikasi menggunakan class method
-        notifications = Notification.create_broadcast_notification(
+        # Broadcast notifikasi dengan bulk insert; satu pengingat per mekanik per hari
+        created_count = Notification.bulk_broadcast(
             title=title,
             message=message,
-            recipients=foremen_without_report,
-            created_by=request.user
+            recipients=recipient_ids,
+            created_by=request.user,
+            kind='report_reminder',
+            key_date=today,
         )
         
-        print(f"DEBUG: Created {len(notifications)} notifications")
-        
-        # Verify notifications were created
-        created_count = Notification.objects.filter(
-            title=title,
-            created_by=request.user
-        ).count()
-        
-        print(f"DEBUG: Verified {created_count} notifications in database")
+        if not created_count:
+            return JsonResponse({
+                'success': False,
+                'message': 'Semua mekanik yang belum mengisi sudah menerima pengingat hari ini.'
+            })
         
         return JsonResponse({
             'success': True,
-            'message': f'Notifikasi berhasil dikirim ke {len(notifications)} mekanik.',
-            'recipients_count': len(notifications),
-            'debug_info': {
-                'total_foremen': all_foremen.count(),
-                'foremen_without_report': len(foremen_without_report),
-                'notifications_created': len(notifications),
-                'verified_in_db': created_count
-            }
+            'message': f'Notifikasi berhasil dikirim ke {created_count} mekanik.',
+            'recipients_count': created_count,
         })
         
     except Exception as e:
-        print(f"DEBUG: Error in broadcast_notification: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Broadcast notification failed")
         return JsonResponse({
             'success': False,
             'message': f'Terjadi kesalahan: {str(e)}'
         })
 
 
+def _image_etag(sha256, size):
+    """ETag gambar dokumentasi: SHA-256 gambar dasar, plus nama rendition bila ada"""
+    if not sha256:
+        return None
+    return f"{sha256}.{size}" if size else sha256
+
+
+def _analysis_image_etag(request, report_id, field_type):
+    """
+    ETag gambar dokumentasi dari SHA-256 isinya (disimpan saat upload). Hanya
+    kolom hash yang dibaca, sehingga jalur 304 tidak menyentuh blob/file gambar.
+    """
+    if field_type not in AnalysisReport.IMAGE_FIELD_TYPES or not request.user.is_authenticated:
+        return None
+    size = request.GET.get('size') or None
+    if size and size not in RENDITIONS:
+        return None
+    row = AnalysisReport.objects.filter(id=report_id).values_list(
+        'foreman_id', AnalysisReport.image_field(field_type, 'sha256')
+    ).first()
+    if row is None:
+        return None
+    foreman_id, sha256 = row
+    # User tanpa akses tidak boleh mendapat 304 (dan mengetahui hash gambar)
+    if request.user.role == 'foreman' and foreman_id != request.user.id:
+        return None
+    return _image_etag(sha256, size)
+
+
+def _parse_byte_range(header, size):
+    """
+    Parse header Range dengan satu rentang ("bytes=0-99", "bytes=100-", "bytes=-500").
+    Return (start, end) inklusif, None bila header tidak ada atau tidak didukung
+    (kirim seluruh file), atau False bila rentang di luar ukuran file (416).
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, sep, end = header[len('bytes='):].strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if start:
+            start = int(start)
+            if end and int(end) < start:
+                return None
+            end = min(int(end), size - 1) if end else size - 1
+        elif end:
+            suffix = int(end)
+            if suffix == 0:
+                return False
+            start, end = max(size - suffix, 0), size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start < 0 or start >= size:
+        return False
+    return start, end
+
+
 @login_required
+@condition(etag_func=_analysis_image_etag)
 def serve_analysis_report_image(request, report_id, field_type):
     """
-    View untuk menampilkan gambar dari database untuk AnalysisReport
+    View untuk menampilkan gambar dokumentasi AnalysisReport dari image store
     field_type: 'sebelum' atau 'sesudah'
+
+    ?size=thumb|medium|print memilih rendition (default: gambar dasar).
+    Mendukung If-None-Match (304 lewat ETag = SHA-256 gambar) dan header Range.
+    URL dengan ?v=<hash> (lihat AnalysisReport.image_url) di-cache browser
+    selama IMAGE_CACHE_MAX_AGE_VERSIONED karena isinya tidak pernah berubah.
     """
+    if field_type not in AnalysisReport.IMAGE_FIELD_TYPES:
+        return HttpResponse('Invalid field type', status=400)
+    size = request.GET.get('size') or None
+    if size and size not in RENDITIONS:
+        return HttpResponse('Invalid size', status=400)
+    
+    # Hanya blob field yang diminta yang ikut di-load (kosong bila gambar sudah di image store)
+    report = get_object_or_404(AnalysisReport.objects.with_images(field_type), id=report_id)
+    
+    # Cek apakah user memiliki akses ke report ini
+    if request.user.role == 'foreman' and report.foreman_id != request.user.id:
+        return HttpResponse('Unauthorized', status=401)
+    
     try:
-        report = get_object_or_404(AnalysisReport, id=report_id)
-        
-        # Cek apakah user memiliki akses ke report ini
-        if request.user.role == 'foreman' and report.foreman != request.user:
-            return HttpResponse('Unauthorized', status=401)
-        
-        # Tentukan field yang akan diambil
-        if field_type == 'sebelum':
-            image_data = report.dokumentasi_sebelum_data
-            content_type = report.dokumentasi_sebelum_content_type
-            filename = report.dokumentasi_sebelum_filename
-        elif field_type == 'sesudah':
-            image_data = report.dokumentasi_sesudah_data
-            content_type = report.dokumentasi_sesudah_content_type
-            filename = report.dokumentasi_sesudah_filename
-        else:
-            return HttpResponse('Invalid field type', status=400)
-        
-        # Cek apakah gambar ada
-        if not image_data:
-            return HttpResponse('Image not found', status=404)
-        
-        # Return gambar sebagai HTTP response
-        response = HttpResponse(image_data, content_type=content_type or 'image/jpeg')
-        if filename:
-            response['Content-Disposition'] = f'inline; filename="{filename}"'
-        
+        image = report.open_image(field_type, size)
+    except FileNotFoundError:
+        logger.error("Image %s of analysis report %s missing from image store", field_type, report_id)
+        image = None
+    
+    # Cek apakah gambar ada
+    if image is None:
+        return HttpResponse('Image not found', status=404)
+    
+    content_type = getattr(report, AnalysisReport.image_field(field_type, 'content_type')) or 'image/jpeg'
+    filename = getattr(report, AnalysisReport.image_field(field_type, 'filename'))
+    etag = _image_etag(getattr(report, AnalysisReport.image_field(field_type, 'sha256')), size)
+    
+    image.seek(0, os.SEEK_END)
+    size = image.tell()
+    image.seek(0)
+    
+    byte_range = _parse_byte_range(request.META.get('HTTP_RANGE'), size)
+    # If-Range: rentang hanya dipakai bila klien masih memegang versi gambar yang sama
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if byte_range and if_range and (not etag or if_range.strip('"') != etag):
+        byte_range = None
+    
+    if byte_range is False:
+        image.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
         return response
-        
-    except AnalysisReport.DoesNotExist:
-        return HttpResponse('Report not found', status=404)
-    except Exception as e:
-        return HttpResponse(f'Error: {str(e)}', status=500)
+    
+    if byte_range:
+        start, end = byte_range
+        with image:
+            image.seek(start)
+            response = HttpResponse(image.read(end - start + 1), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        # Stream file gambar tanpa membaca seluruh isinya ke memori
+        response = FileResponse(image, content_type=content_type, filename=filename or '')
+    
+    response['Accept-Ranges'] = 'bytes'
+    version = report.image_version(field_type)
+    if version and request.GET.get('v') == version:
+        patch_cache_control(response, private=True, max_age=settings.IMAGE_CACHE_MAX_AGE_VERSIONED, immutable=True)
+    else:
+        patch_cache_control(response, private=True, max_age=settings.IMAGE_CACHE_MAX_AGE)
+    return response
+
+
+# Jumlah notifikasi per respons API (dropdown / popup notifikasi)
+NOTIFICATIONS_PAGE_SIZE = 10
+
+
+def _notification_counter(request):
+    """NotificationCounter user, dibaca (atau dibuat) sekali per request untuk ETag & unread_count"""
+    if not hasattr(request, "_notification_counter"):
+        request._notification_counter = NotificationCounter.for_user(request.user)
+    return request._notification_counter
+
+
+def _notifications_etag(request):
+    """ETag API notifikasi: versi notifikasi user (NotificationCounter) + parameter delta"""
+    if not request.user.is_authenticated:
+        return None
+    version = _notification_counter(request).version
+    return f"{request.user.pk}-{version}-{request.GET.get('since_id', '')}"
 
 
 @login_required
-@user_passes_test(lambda u: u.role in ['admin', 'superadmin'])
+@condition(etag_func=_notifications_etag)
 def get_notifications(request):
-    """API untuk mengambil notifikasi user yang sedang login"""
-    notifications = Notification.objects.filter(
-        recipient=request.user
-    ).order_by('-created_at')[:10]
+    """
+    API untuk mengambil notifikasi user yang sedang login.
+
+    Mendukung conditional GET (ETag / If-None-Match -> 304 dengan satu lookup versi)
+    dan `?since_id=<id>` untuk hanya mengambil notifikasi yang lebih baru, urut
+    id naik. Bila lebih dari NOTIFICATIONS_PAGE_SIZE yang baru, `has_more` bernilai
+    true dan klien meminta lagi dengan `latest_id` sebagai since_id.
+    """
+    notifications = Notification.objects.filter(recipient=request.user)
+
+    since_id = request.GET.get('since_id')
+    if since_id:
+        try:
+            since_id = int(since_id)
+        except ValueError:
+            return JsonResponse({'error': 'since_id harus berupa angka'}, status=400)
+        rows = list(
+            notifications.filter(id__gt=since_id).order_by('id')[:NOTIFICATIONS_PAGE_SIZE + 1]
+        )
+        has_more = len(rows) > NOTIFICATIONS_PAGE_SIZE
+        rows = rows[:NOTIFICATIONS_PAGE_SIZE]
+        # Id terakhir yang benar-benar dikirim, bukan id terbesar di database
+        latest_id = rows[-1].id if rows else since_id
+    else:
+        rows = list(notifications.order_by('-created_at', '-id')[:NOTIFICATIONS_PAGE_SIZE])
+        has_more = False
+        latest_id = max((n.id for n in rows), default=None)
     
-    unread_count = Notification.objects.filter(
-        recipient=request.user,
-        status='unread'
-    ).count()
+    unread_count = max(_notification_counter(request).unread, 0)
     
     notifications_data = []
-    for notification in notifications:
+    for notification in rows:
         notifications_data.append({
             'id': notification.id,
             'title': notification.title,
@@ -1561,10 +1782,85 @@ def get_notifications(request):
             'is_unread': notification.status == 'unread'
         })
     
-    return JsonResponse({
+    response = JsonResponse({
         'notifications': notifications_data,
-        'unread_count': unread_count
+        'unread_count': unread_count,
+        # Dipakai klien sebagai since_id pada poll berikutnya
+        'latest_id': latest_id,
+        'has_more': has_more,
     })
+    # Browser wajib revalidasi (If-None-Match) di setiap poll
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# Interval stream SSE (detik): komentar keep-alive & resync jumlah unread dari DB
+# (resync menangkap notifikasi yang dibuat proses lain, mis. notification_scheduler)
+NOTIFICATION_STREAM_KEEPALIVE = 15
+NOTIFICATION_STREAM_RESYNC = 60
+
+
+def _unread_count(user_id):
+    return NotificationCounter.unread_for(user_id)
+
+
+async def _notification_events(user_id):
+    subscriber = notification_broker.subscribe(user_id)
+    _, queue = subscriber
+    loop = asyncio.get_running_loop()
+    try:
+        # Saran jeda reconnect untuk EventSource + state awal
+        yield "retry: 5000\n\n"
+        last_count = await sync_to_async(_unread_count)(user_id)
+        yield _sse_event('unread', {'unread_count': last_count, 'reason': 'initial'})
+        last_sync = loop.time()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), NOTIFICATION_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                event = None
+
+            if event is None and loop.time() - last_sync < NOTIFICATION_STREAM_RESYNC:
+                yield ": keep-alive\n\n"
+                continue
+
+            count = await sync_to_async(_unread_count)(user_id)
+            last_sync = loop.time()
+            if event is None and count == last_count:
+                yield ": keep-alive\n\n"
+                continue
+
+            last_count = count
+            yield _sse_event('unread', {'unread_count': count, **(event or {'reason': 'resync'})})
+    finally:
+        notification_broker.unsubscribe(user_id, subscriber)
+
+
+def _sse_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+@login_required
+async def notification_stream(request):
+    """
+    Stream Server-Sent Events berisi jumlah notifikasi belum dibaca milik user.
+
+    Hanya aktif bila dilayani lewat ASGI (backend/asgi.py); di bawah WSGI
+    setiap koneksi akan menahan satu worker, jadi endpoint membalas 204 dan
+    EventSource di browser berhenti lalu kembali ke polling.
+    """
+    if not hasattr(request, 'scope'):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(
+        _notification_events(user.pk),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @login_required
@@ -1587,25 +1883,12 @@ def user_notifications(request, username):
         recipient=target_user
     ).order_by('-created_at')
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(notifications, 10)  # 10 notifikasi per halaman
-    page_number = request.GET.get('page')
-    notifications = paginator.get_page(page_number)
-    
-    unread_count = Notification.objects.filter(
-        recipient=target_user,
-        status='unread'
-    ).count()
+    # Pagination keyset per (created_at, id)
+    paginator = KeysetPaginator(notifications, 10, ordering=('-created_at', '-id'))
+    notifications = paginator.get_page(request.GET.get('cursor'))
     
     # Auto-mark semua notifikasi sebagai read saat halaman dibuka
-    Notification.objects.filter(
-        recipient=target_user,
-        status='unread'
-    ).update(
-        status='read',
-        read_at=timezone.now()
-    )
+    Notification.mark_all_read(target_user)
     
     context = {
         'notifications': notifications,
@@ -1622,16 +1905,11 @@ def notification_list(request):
         recipient=request.user
     ).order_by('-created_at')
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(notifications, 10)  # 10 notifikasi per halaman
-    page_number = request.GET.get('page')
-    notifications = paginator.get_page(page_number)
+    # Pagination keyset per (created_at, id)
+    paginator = KeysetPaginator(notifications, 10, ordering=('-created_at', '-id'))
+    notifications = paginator.get_page(request.GET.get('cursor'))
     
-    unread_count = Notification.objects.filter(
-        recipient=request.user,
-        status='unread'
-    ).count()
+    unread_count = NotificationCounter.unread_for(request.user)
     
     context = {
         'notifications': notifications,
@@ -1667,13 +1945,7 @@ def mark_all_notifications_read(request):
     """Tandai semua notifikasi sebagai dibaca"""
     try:
         # Update semua notifikasi yang belum dibaca
-        updated_count = Notification.objects.filter(
-            recipient=request.user,
-            status='unread'
-        ).update(
-            status='read',
-            read_at=timezone.now()
-        )
+        updated_count = Notification.mark_all_read(request.user)
         
         return JsonResponse({
             'success': True,
@@ -1688,6 +1960,42 @@ def mark_all_notifications_read(request):
         }, status=500)
 
 
+# Batas jumlah id per request mark-as-read batch
+MARK_READ_MAX_IDS = 200
+
+
+@login_required
+@require_http_methods(["POST"])
+def mark_notifications_read(request):
+    """
+    Tandai beberapa notifikasi sekaligus sebagai sudah dibaca.
+
+    Body JSON: {"ids": [1, 2, 3]}. Satu UPDATE ... WHERE id IN (...) AND
+    recipient = user; id milik user lain diabaikan.
+    """
+    try:
+        ids = json.loads(request.body or b'{}').get('ids')
+    except (ValueError, AttributeError):
+        ids = None
+    if (
+        not isinstance(ids, list)
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+        or len(ids) > MARK_READ_MAX_IDS
+    ):
+        return JsonResponse({
+            'success': False,
+            'message': f'ids harus berupa daftar maksimal {MARK_READ_MAX_IDS} angka.'
+        }, status=400)
+
+    updated_count = Notification.mark_all_read(request.user, ids=ids) if ids else 0
+
+    return JsonResponse({
+        'success': True,
+        'updated_count': updated_count,
+        'unread_count': NotificationCounter.unread_for(request.user),
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
 def mark_notification_read(request, notification_id):
@@ -1701,11 +2009,8 @@ def mark_notification_read(request, notification_id):
         
         notification.mark_as_read()
         
-        # Hitung ulang jumlah notifikasi yang belum dibaca
-        unread_count = Notification.objects.filter(
-            recipient=request.user,
-            status='unread'
-        ).count()
+        # Jumlah notifikasi yang belum dibaca (dari counter, tanpa COUNT)
+        unread_count = NotificationCounter.unread_for(request.user)
         
         return JsonResponse({
             'success': True,